@@ -6,10 +6,11 @@ Uses hashing to collapse patterns and ensure privacy + stability.
 """
 
 import hashlib
-import json
 import re
 from typing import Dict, List, Optional
 
+from .utils import event_details
+
 
 def canonicalize_event(event: Dict) -> str:
     """Rule-free canonical event encoder.
@@ -97,18 +98,15 @@ def extract_prompt_from_event(event: Dict) -> Optional[str]:
             if text:
                 return str(text)
         elif isinstance(details, str):
-            # Try to parse JSON details
-            try:
-                details_dict = json.loads(details)
-                text = (
-                    details_dict.get('text') or 
-                    details_dict.get('content') or 
-                    details_dict.get('prompt')
-                )
-                if text:
-                    return str(text)
-            except (json.JSONDecodeError, TypeError):
-                pass
+            # JSON details, decoded through the cache shared with the encoders
+            details_dict = event_details(event)
+            text = (
+                details_dict.get('text') or 
+                details_dict.get('content') or 
+                details_dict.get('prompt')
+            )
+            if text:
+                return str(text)
     
     return None
 
@@ -0,0 +1,91 @@
+"""
+Persistent Embedding Cache
+
+Disk-backed store for intent embeddings so repeated taxonomy runs skip the
+encoder for descriptions that were already embedded.
+
+Vectors are keyed by sha256(embedding_model + normalized text) and stored as
+float16 bytes in a SQLite database under the taxonomy cache directory.
+Because the model name is part of the key, switching models never returns
+stale vectors.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# SQLite's default limit on host parameters per statement is 999
+_MAX_QUERY_PARAMS = 900
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different descriptions share a key."""
+    return " ".join(text.split())
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Cache key for a (model, text) pair."""
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed cache mapping (model, text) to a float16 embedding."""
+
+    def __init__(self, path: Path, model_name: str):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # The connection may be used from worker threads; serialize access
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            Dictionary mapping each cached text to its float32 embedding
+        """
+        keys = {embedding_key(self.model_name, t): t for t in texts}
+        key_list = list(keys)
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(key_list), _MAX_QUERY_PARAMS):
+                chunk = key_list[start:start + _MAX_QUERY_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[keys[key]] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+        return found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        """Store embeddings (downcast to float16) for the given texts."""
+        rows = [
+            (embedding_key(self.model_name, t), np.asarray(v, dtype=np.float16).tobytes())
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
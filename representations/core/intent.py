@@ -16,8 +16,9 @@ import hashlib
 import json
 import os
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple, Any, Union
+from typing import Optional, List, Dict, Tuple, Any, Union, Iterator
 
 import numpy as np
 
@@ -40,6 +41,9 @@ try:
 except ImportError:
     SKLEARN_AVAILABLE = False
 
+from .embedding_cache import EmbeddingCache
+from .utils import event_details
+
 
 # =============================================================================
 # FIXED CATEGORIES (Backward Compatible)
@@ -83,14 +87,19 @@ class EmergentIntentTaxonomy:
         embedding_model: str = "all-MiniLM-L6-v2",
         cache_dir: Optional[Path] = None,
         min_cluster_size: int = 5,
+        persist_embeddings: bool = False,
+        extract_concurrency: int = 16,
     ):
         self.embedding_model_name = embedding_model
         self.cache_dir = cache_dir or Path(__file__).parent.parent / "cache" / "emergent_intent"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.min_cluster_size = min_cluster_size
+        self.persist_embeddings = persist_embeddings
+        self.extract_concurrency = extract_concurrency
         
         # Lazy-loaded components
         self._encoder = None
+        self._embedding_store = None
         self._taxonomy = None
         self._centroids = None
         self._cluster_labels = None
@@ -111,6 +120,13 @@ class EmergentIntentTaxonomy:
             self._encoder = SentenceTransformer(self.embedding_model_name)
         return self._encoder
     
+    @property
+    def embedding_store(self) -> Optional[EmbeddingCache]:
+        """Lazy-open the on-disk embedding cache (None if persistence is disabled)."""
+        if self._embedding_store is None and self.persist_embeddings:
+            self._embedding_store = EmbeddingCache(self.cache_dir / "embeddings.sqlite", self.embedding_model_name)
+        return self._embedding_store
+    
     def extract_intent_description(
         self,
         event: Dict,
@@ -132,7 +148,7 @@ class EmergentIntentTaxonomy:
             Natural language intent description
         """
         # Create cache key
-        cache_key = hashlib.md5(json.dumps(event, sort_keys=True, default=str).encode()).hexdigest()
+        cache_key = self._extraction_cache_key(event)
         
         if cache_key in self._extraction_cache:
             return self._extraction_cache[cache_key]
@@ -143,7 +159,7 @@ class EmergentIntentTaxonomy:
         if isinstance(details, str):
             try:
                 details = json.loads(details)
-            except:
+            except json.JSONDecodeError:
                 details = {}
         
         file_path = details.get('file_path') or details.get('file', '')
@@ -171,6 +187,108 @@ class EmergentIntentTaxonomy:
         self._extraction_cache[cache_key] = description
         return description
     
+    def extract_intent_descriptions(
+        self,
+        events: List[Dict],
+        use_llm: bool = True,
+        llm_extractor: Optional[callable] = None,
+    ) -> List[str]:
+        """
+        Extract intent descriptions for many events, concurrently when LLM-bound.
+        
+        LLM extraction is one independent network round-trip per event, so
+        events are fanned out over a pool of ``extract_concurrency`` threads.
+        If ``llm_extractor`` has a ``batch(events)`` method it is called once
+        for every event that still needs LLM extraction.
+        
+        Args:
+            events: List of event dictionaries
+            use_llm: Use LLM for intent extraction
+            llm_extractor: Custom LLM extraction function
+            
+        Returns:
+            Intent descriptions, in the same order as events
+        """
+        return list(self._iter_intent_descriptions(events, use_llm, llm_extractor))
+    
+    def extract_and_embed_batch(
+        self,
+        events: List[Dict],
+        use_llm: bool = True,
+        llm_extractor: Optional[callable] = None,
+        batch_size: int = 64,
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Extract and embed intent descriptions in one pipelined pass.
+        
+        Descriptions are consumed in event order while the extraction pool is
+        still working, and every ``batch_size`` of them is embedded straight
+        away, so encoder time overlaps LLM latency instead of following it.
+        
+        Args:
+            events: List of event dictionaries
+            use_llm: Use LLM for intent extraction
+            llm_extractor: Custom LLM extraction function
+            batch_size: Encoder batch size
+            
+        Returns:
+            (descriptions, embeddings) where embeddings is a float32 array of
+            shape (len(events), dim), rows aligned with descriptions
+        """
+        descriptions: List[str] = []
+        embeddings = None
+        
+        for description in self._iter_intent_descriptions(events, use_llm, llm_extractor):
+            descriptions.append(description)
+            if len(descriptions) % batch_size and len(descriptions) < len(events):
+                continue
+            
+            start = (len(descriptions) - 1) // batch_size * batch_size
+            vectors = self.embed_intents_batch(descriptions[start:], batch_size=batch_size)
+            if embeddings is None:
+                embeddings = np.empty((len(events), vectors.shape[1]), dtype=np.float32)
+            embeddings[start:len(descriptions)] = vectors
+        
+        if embeddings is None:
+            embeddings = self.embed_intents_batch(descriptions, batch_size=batch_size)
+        return descriptions, embeddings
+    
+    def _iter_intent_descriptions(
+        self,
+        events: List[Dict],
+        use_llm: bool,
+        llm_extractor: Optional[callable],
+    ) -> Iterator[str]:
+        """Yield intent descriptions in event order as they are extracted."""
+        if use_llm and llm_extractor is not None and hasattr(llm_extractor, 'batch'):
+            pending = [event for event in events if self._needs_llm_extraction(event)]
+            if pending:
+                for event, description in zip(pending, llm_extractor.batch(pending)):
+                    self._extraction_cache[self._extraction_cache_key(event)] = description
+        
+        def extract(event: Dict) -> str:
+            return self.extract_intent_description(event, use_llm=use_llm, llm_extractor=llm_extractor)
+        
+        llm_bound = use_llm and (llm_extractor is not None or OPENROUTER_KEY)
+        if not llm_bound or self.extract_concurrency <= 1 or len(events) <= 1:
+            for event in events:
+                yield extract(event)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.extract_concurrency) as executor:
+            yield from executor.map(extract, events)
+    
+    @staticmethod
+    def _extraction_cache_key(event: Dict) -> str:
+        return hashlib.md5(json.dumps(event, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _needs_llm_extraction(self, event: Dict) -> bool:
+        """True if extract_intent_description would fall through to the LLM for this event."""
+        if self._extraction_cache_key(event) in self._extraction_cache:
+            return False
+        annotation = event.get('annotation') or event.get('intent', '')
+        return not (annotation and len(str(annotation)) > 5)
+    
     def _heuristic_intent_description(
         self,
         event_type: str,
@@ -235,7 +353,7 @@ class EmergentIntentTaxonomy:
         if isinstance(details, str):
             try:
                 details = json.loads(details)
-            except:
+            except json.JSONDecodeError:
                 details = {}
         
         context = f"""Event type: {event.get('type', 'unknown')}
@@ -285,14 +403,61 @@ Your response:"""
             )
     
     def embed_intent(self, description: str) -> np.ndarray:
-        """Embed intent description into vector space."""
-        if description in self._embedding_cache:
-            return self._embedding_cache[description]
+        """Embed intent description into vector space.
         
-        embedding = self.encoder.encode(description, convert_to_numpy=True)
-        self._embedding_cache[description] = embedding
-        return embedding
-    
+        Per-event callers embed one description at a time, so this skips the
+        on-disk cache rather than paying a query and a commit per miss.
+        """
+        return self.embed_intents_batch([description], use_store=False)[0]
+
+    def embed_intents_batch(
+        self,
+        descriptions: List[str],
+        batch_size: int = 64,
+        use_store: bool = True,
+    ) -> np.ndarray:
+        """
+        Embed many intent descriptions with a single batched encoder call.
+
+        Descriptions already in the in-memory or on-disk embedding cache are
+        skipped; the rest are forwarded to the encoder in one call so the
+        forward pass runs in ceil(N / batch_size) batches instead of N
+        independent passes. New vectors are written back to the disk cache
+        in one commit per call.
+
+        Args:
+            descriptions: Intent descriptions to embed
+            batch_size: Encoder batch size
+            use_store: Read and write the on-disk cache (when persistence is enabled)
+
+        Returns:
+            float32 array of shape (len(descriptions), dim), rows L2-normalized
+        """
+        if not descriptions:
+            return np.empty((0, self.encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+        
+        missing = list(dict.fromkeys(d for d in descriptions if d not in self._embedding_cache))
+        
+        store = self.embedding_store if missing and use_store else None
+        if store is not None:
+            cached = store.get_many(missing)
+            self._embedding_cache.update(cached)
+            missing = [d for d in missing if d not in cached]
+        
+        if missing:
+            vectors = self.encoder.encode(
+                missing,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+            self._embedding_cache.update(zip(missing, vectors))
+            if store is not None:
+                store.put_many(missing, vectors)
+
+        return np.array([self._embedding_cache[d] for d in descriptions], dtype=np.float32)
+
     def discover_taxonomy(
         self,
         events: List[Dict],
@@ -325,13 +490,10 @@ Your response:"""
             raise ImportError("scikit-learn required for taxonomy discovery")
         
         # Extract intent descriptions
-        descriptions = []
-        for event in events:
-            desc = self.extract_intent_description(event, use_llm=use_llm, llm_extractor=llm_extractor)
-            descriptions.append(desc)
+        descriptions = self.extract_intent_descriptions(events, use_llm=use_llm, llm_extractor=llm_extractor)
         
         # Embed all descriptions
-        embeddings = np.array([self.embed_intent(d) for d in descriptions])
+        embeddings = self.embed_intents_batch(descriptions)
         
         # Cluster embeddings
         if n_clusters is not None:
@@ -774,7 +936,6 @@ def extract_event_intent(event: Dict, use_canonicalized_paths: bool = False) ->
     Returns:
         List of intent category strings (multi-dimensional, one-hot-like encoding)
     """
-    import json
     from pathlib import Path
     
     intents = []
@@ -791,16 +952,7 @@ def extract_event_intent(event: Dict, use_canonicalized_paths: bool = False) ->
     
     # Infer from event type and details
     event_type = (event.get('type') or '').lower()
-    details = event.get('details', {})
-    
-    if isinstance(details, str):
-        try:
-            details = json.loads(details)
-        except:
-            details = {}
-    
-    if not isinstance(details, dict):
-        details = {}
+    details = event_details(event)
     
     # File operations - works with both canonicalized and named paths
     file_path = details.get('file_path') or details.get('file')
@@ -992,6 +1144,7 @@ def intent_tokens_for_event(
     use_canonicalized_paths: bool = False,
     use_emergent: bool = True,  # Default to emergent (Values in the Wild approach)
     emergent_threshold: float = 0.1,
+    event_intent: Optional[List[str]] = None,
 ) -> list[str]:
     """Extract intent tokens from an event (more expressive than prompt-only).
     
@@ -1005,6 +1158,8 @@ def intent_tokens_for_event(
         use_canonicalized_paths: If True, intent extraction adapts to canonicalized paths
         use_emergent: If True (default), use emergent taxonomy; False for fixed categories
         emergent_threshold: Minimum probability for emergent intents
+        event_intent: Precomputed extract_event_intent(event, use_canonicalized_paths)
+                      result, for callers that already need it
     
     Returns:
         List of intent tokens (multi-dimensional encoding)
@@ -1020,7 +1175,9 @@ def intent_tokens_for_event(
     tokens = []
     
     # Extract intent from event characteristics (works with canonicalized or named paths)
-    intent_vector = extract_event_intent(event, use_canonicalized_paths=use_canonicalized_paths)
+    intent_vector = event_intent
+    if intent_vector is None:
+        intent_vector = extract_event_intent(event, use_canonicalized_paths=use_canonicalized_paths)
     tokens.extend(intent_vector)
     
     # Also check for prompts in event (most expressive signal)
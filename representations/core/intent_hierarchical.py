@@ -12,19 +12,228 @@ Reference: Clio (2024) - recursive, human-guided clustering for conversation ana
 """
 
 import numpy as np
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Callable, Union
 from pathlib import Path
 from collections import defaultdict
+from dataclasses import dataclass, field
 
 try:
     from sklearn.cluster import AgglomerativeClustering
     from sklearn.metrics import silhouette_score, calinski_harabasz_score
+    from scipy.cluster.hierarchy import fcluster, linkage
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
 
+# Optional: fastcluster's nearest-neighbor-chain Ward linkage runs in O(N) memory,
+# avoiding the O(N^2) distance matrix sklearn materializes
+try:
+    import fastcluster
+    FASTCLUSTER_AVAILABLE = True
+except ImportError:
+    FASTCLUSTER_AVAILABLE = False
+
+# Optional: JIT-compiled token counting for label summarization
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from .intent import EmergentIntentTaxonomy
 
+# Above this many events, HDBSCAN runs on unit vectors instead of an N x N distance matrix
+PRECOMPUTED_DISTANCE_MAX_N = 5000
+
+# Named Ward linkage implementations; a callable returning a scipy linkage matrix is also accepted
+LINKAGE_BACKENDS = ('auto', 'fastcluster', 'scipy')
+LinkageBackend = Union[str, Callable[[np.ndarray], np.ndarray]]
+
+
+def _top2_token_ids(token_ids: np.ndarray, counts: np.ndarray, first_pos: np.ndarray) -> Tuple[int, int]:
+    """
+    Two most frequent token ids, ties broken by first occurrence (like Counter.most_common).
+    
+    counts and first_pos are vocabulary-sized scratch buffers; only the entries
+    touched here are used, and counts is zeroed again before returning.
+    Returns -1 for a missing slot.
+    """
+    n = token_ids.shape[0]
+    for pos in range(n):
+        t = token_ids[pos]
+        if counts[t] == 0:
+            first_pos[t] = pos
+        counts[t] += 1
+    
+    # Visit distinct tokens in first-seen order; strict > keeps the earliest on ties
+    best = -1
+    second = -1
+    for pos in range(n):
+        t = token_ids[pos]
+        if first_pos[t] != pos:
+            continue
+        c = counts[t]
+        if best == -1 or c > counts[best]:
+            second = best
+            best = t
+        elif second == -1 or c > counts[second]:
+            second = t
+    
+    for pos in range(n):
+        counts[token_ids[pos]] = 0
+    return best, second
+
+
+if NUMBA_AVAILABLE:
+    _top2_token_ids = njit(cache=True, nogil=True)(_top2_token_ids)
+
+
+def _l2_normalize(X: np.ndarray) -> np.ndarray:
+    """Scale vectors (rows of a matrix, or a single vector) to unit length."""
+    return X / np.linalg.norm(X, axis=-1, keepdims=True).clip(min=1e-12)
+
+
+def _group_by_label(labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Partition rows by label with a single stable argsort.
+    
+    Returns:
+        (unique_labels, order, offsets) where rows order[offsets[k]:offsets[k + 1]]
+        carry label unique_labels[k]
+    """
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    unique_labels, counts = np.unique(labels[order], return_counts=True)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return unique_labels, order, offsets
+
+
+def _regroup_leaves(leaf_order: np.ndarray, leaf_parent_labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rearrange leaves so every parent cluster is a contiguous run.
+    
+    leaf_order lists event indices with each current cluster contiguous and
+    leaf_parent_labels gives every event's parent label (indexed by event).
+    The stable sort keeps each parent's children contiguous and in order, so
+    node event_indices can be slices of the returned arrangement.
+    
+    Returns:
+        (arrangement, offsets) where arrangement[offsets[k]:offsets[k + 1]] are
+        the events of the k-th parent label in ascending order
+    """
+    _, perm, offsets = _group_by_label(leaf_parent_labels[leaf_order])
+    return leaf_order[perm], offsets
+
+
+def _level_cluster_counts(n_leaves: int, divisors: List[int]) -> List[int]:
+    """
+    Number of clusters for each level above the leaves.
+    
+    Level l gets max(2, k_{l-1} // divisors[l - 1]) clusters. The sequence stops
+    at the first level that would not merge anything (k >= k_{l-1}), so no
+    level is built by an identity clustering.
+    """
+    counts = []
+    k_prev = n_leaves
+    for divisor in divisors:
+        k = max(2, k_prev // divisor)
+        if k >= k_prev:
+            break
+        counts.append(k)
+        k_prev = k
+    return counts
+
+
+@dataclass(slots=True)
+class ClusterNode:
+    """
+    One cluster of the hierarchy.
+    
+    Fixed-shape slotted record in place of a per-cluster dict. Only
+    node['key'] and node.get('key') are kept for callers that read nodes
+    like mappings; the rest of the dict protocol (`in`, keys(), items(),
+    iteration, item assignment) is not supported, so use attributes or
+    dataclasses.asdict(node) instead.
+    """
+    label: str
+    description: str
+    examples: List[str]
+    centroid: np.ndarray  # (D,) size-weighted mean of leaf embeddings
+    centroid_sum: np.ndarray  # (D,) sum of leaf embeddings
+    size: int
+    event_indices: np.ndarray  # int32 view into the leaf arrangement
+    children: List[int] = field(default_factory=list)
+    centroid_unit: Optional[np.ndarray] = None  # L2-normalized centroid, set at indexing
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+
+@dataclass
+class LevelArrays:
+    """
+    Structure-of-arrays view of one hierarchy level.
+    
+    Row i describes cluster ids[i]. Centroid math runs on these contiguous
+    arrays; the per-cluster ClusterNodes are kept for presentation only. Clusters
+    carry the sum of their leaf embeddings so merging is a pure add and the
+    centroid is the size-weighted mean of all leaves underneath.
+    """
+    centroid_sums: np.ndarray  # (K, D) float32 sum of leaf embeddings
+    sizes: np.ndarray  # (K,) number of events under each cluster
+    ids: List[int]  # cluster id per row
+    labels: List[str]  # cluster label per row
+    centroids: Optional[np.ndarray] = None  # (K, D) centroid_sums / sizes
+    
+    def __post_init__(self):
+        if self.centroids is None:
+            self.centroids = self.centroid_sums / self.sizes[:, None].astype(self.centroid_sums.dtype)
+    
+    def group_reduce(self, order: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Summed leaf embeddings and total size of each row group produced by _group_by_label."""
+        centroid_sums = np.add.reduceat(self.centroid_sums[order], offsets[:-1], axis=0)
+        sizes = np.add.reduceat(self.sizes[order], offsets[:-1])
+        return centroid_sums, sizes
+
+
+def _ward_linkage(points: np.ndarray, backend: LinkageBackend = 'auto') -> np.ndarray:
+    """
+    Ward linkage matrix over points.
+    
+    Backends trade memory for availability:
+    - 'auto' / 'fastcluster': fastcluster's nearest-neighbor-chain linkage_vector,
+      O(N * D) memory but single-threaded; falls back to scipy if not installed
+    - 'scipy': scipy's linkage, which materializes O(N^2) condensed distances
+    - callable: points (float32, C-contiguous) -> scipy-compatible linkage matrix,
+      the hook for parallel HAC libraries when N reaches the hundreds of thousands
+    """
+    if callable(backend):
+        return np.asarray(backend(np.ascontiguousarray(points, dtype=np.float32)), dtype=np.float64)
+    
+    points = np.asarray(points, dtype=np.float64)
+    if backend != 'scipy' and FASTCLUSTER_AVAILABLE:
+        return fastcluster.linkage_vector(points, method='ward')
+    return linkage(points, method='ward')
+
+
+def _ward_labels(points: np.ndarray, n_clusters: int, backend: LinkageBackend = 'auto') -> np.ndarray:
+    """Cut a Ward linkage over points into at most n_clusters, returning 0-based labels."""
+    if callable(backend) or backend == 'scipy' or FASTCLUSTER_AVAILABLE:
+        return fcluster(_ward_linkage(points, backend), t=n_clusters, criterion='maxclust') - 1
+    
+    clusterer = AgglomerativeClustering(
+        n_clusters=n_clusters,
+        linkage='ward',
+        metric='euclidean',
+    )
+    return clusterer.fit_predict(points)
+
 
 class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
     """
@@ -46,11 +255,20 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         cache_dir: Optional[Path] = None,
         min_cluster_size: int = 5,
         max_levels: int = 3,
+        persist_embeddings: bool = False,
+        extract_concurrency: int = 16,
     ):
-        super().__init__(embedding_model, cache_dir, min_cluster_size)
+        super().__init__(embedding_model, cache_dir, min_cluster_size, persist_embeddings, extract_concurrency)
         self.max_levels = max_levels
-        self._hierarchy = None  # Dict[level -> Dict[cluster_id -> cluster_info]]
+        self._hierarchy = None  # Dict[level -> Dict[cluster_id -> ClusterNode]]
         self._cluster_tree = None  # Tree structure: parent -> children mapping
+        self._level_arrays = {}  # level -> LevelArrays
+        self._level_centroid_matrix = {}  # level -> (K, D) L2-normalized centroids
+        self._level_labels = {}  # level -> cluster labels, row-aligned with the centroid matrix
+        self._level_stats = {}  # level -> cluster count and size statistics, fixed at build
+        
+        # Label word interner for the JIT summarization path
+        self._reset_label_vocab()
         
     def discover_taxonomy_hierarchical(
         self,
@@ -59,7 +277,8 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         n_levels: Optional[int] = None,
         use_llm: bool = True,
         llm_extractor: Optional[callable] = None,
-    ) -> Dict[int, Dict[str, Any]]:
+        backend: LinkageBackend = 'auto',
+    ) -> Dict[Tuple[int, int], ClusterNode]:
         """
         Discover hierarchical intent taxonomy.
         
@@ -69,27 +288,28 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
             n_levels: Number of hierarchy levels (None = auto-determine)
             use_llm: Use LLM for intent extraction
             llm_extractor: Custom LLM extraction function
+            backend: Ward linkage implementation, one of LINKAGE_BACKENDS or a
+                callable mapping (N, D) float32 points to a scipy linkage matrix
             
         Returns:
-            Dictionary mapping (level, cluster_id) -> cluster_info
+            Dictionary mapping (level, cluster_id) -> ClusterNode
         """
         if not SKLEARN_AVAILABLE:
             raise ImportError("scikit-learn required for hierarchical taxonomy")
         
-        n_levels = n_levels or self.max_levels
+        if not callable(backend) and backend not in LINKAGE_BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Use one of {LINKAGE_BACKENDS} or a callable")
         
-        # Extract and embed descriptions (same as flat approach)
-        descriptions = []
-        for event in events:
-            desc = self.extract_intent_description(event, use_llm=use_llm, llm_extractor=llm_extractor)
-            descriptions.append(desc)
+        n_levels = n_levels or self.max_levels
+        self._reset_label_vocab()
         
-        embeddings = np.array([self.embed_intent(d) for d in descriptions])
+        # Extract and embed descriptions in one pipelined pass
+        descriptions, embeddings = self.extract_and_embed_batch(events, use_llm=use_llm, llm_extractor=llm_extractor)
         
         if strategy == "agglomerative":
-            return self._discover_agglomerative(embeddings, descriptions, n_levels)
+            return self._discover_agglomerative(embeddings, descriptions, n_levels, backend)
         elif strategy == "recursive":
-            return self._discover_recursive(embeddings, descriptions, n_levels)
+            return self._discover_recursive(embeddings, descriptions, n_levels, backend)
         else:
             raise ValueError(f"Unknown strategy: {strategy}. Use 'agglomerative' or 'recursive'")
     
@@ -98,100 +318,124 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         embeddings: np.ndarray,
         descriptions: List[str],
         n_levels: int,
-    ) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        backend: LinkageBackend = 'auto',
+    ) -> Dict[Tuple[int, int], ClusterNode]:
         """
         Build hierarchy using agglomerative clustering.
         
-        Creates a dendrogram-like structure by clustering at multiple granularities.
+        Builds one Ward dendrogram over the event embeddings and cuts it at
+        successively coarser granularities, one cut per level.
         """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         hierarchy = {}
         cluster_tree = defaultdict(list)  # parent -> [children]
         
+        # Leaf arrangement: event_indices of every node are slices of it
+        leaf_order = np.arange(len(descriptions), dtype=np.int32)
+        
         # Level 0: Individual events (leaf nodes)
         level_0 = {}
         for idx, desc in enumerate(descriptions):
-            level_0[idx] = {
-                'label': desc[:50] + "..." if len(desc) > 50 else desc,
-                'description': desc,
-                'examples': [desc],
-                'centroid': embeddings[idx],
-                'size': 1,
-                'event_indices': [idx],
-            }
+            level_0[idx] = ClusterNode(
+                label=desc[:50] + "..." if len(desc) > 50 else desc,
+                description=desc,
+                examples=[desc],
+                centroid=embeddings[idx],
+                centroid_sum=embeddings[idx],
+                size=1,
+                event_indices=leaf_order[idx:idx + 1],
+            )
         hierarchy[0] = level_0
         
+        # Flattened view for return (keyed by (level, cluster_id)), filled as levels are built
+        flattened = {(0, cluster_id): info for cluster_id, info in level_0.items()}
+        
         # Build levels bottom-up
-        current_embeddings = embeddings
-        current_cluster_ids = list(range(len(descriptions)))
+        current = LevelArrays(
+            centroid_sums=embeddings,
+            sizes=np.ones(len(descriptions), dtype=np.int64),
+            ids=list(level_0.keys()),
+            labels=[c.label for c in level_0.values()],
+            centroids=embeddings,
+        )
         current_level_data = level_0
+        level_arrays = {0: current}
         
-        for level in range(1, n_levels + 1):
-            # Determine number of clusters for this level
-            # Coarser at higher levels
-            n_clusters = max(2, len(current_cluster_ids) // (2 ** level))
-            n_clusters = min(n_clusters, len(current_cluster_ids))
-            
-            if n_clusters < 2:
+        # One linkage over the leaves; every level is a cut of the same tree
+        Z = _ward_linkage(embeddings, backend) if len(embeddings) >= 2 else None
+        leaf_rows = np.arange(len(descriptions))  # leaf -> row of the current level
+        
+        # Coarser at higher levels: level l halves the count l times
+        level_counts = _level_cluster_counts(len(descriptions), [2 ** level for level in range(1, n_levels + 1)])
+        
+        for level, n_clusters in enumerate(level_counts, start=1):
+            # A cut may yield fewer clusters than requested; never re-cut at or above that
+            if n_clusters >= len(current.ids):
                 break
             
-            # Cluster current level's centroids
-            centroids = np.array([current_level_data[cid]['centroid'] for cid in current_cluster_ids])
+            # Cuts of one dendrogram are nested, so all leaves of a current-level
+            # row share a coarser label; scatter it onto the rows
+            leaf_labels = fcluster(Z, t=n_clusters, criterion='maxclust') - 1
+            level_labels = np.empty(len(current.ids), dtype=leaf_labels.dtype)
+            level_labels[leaf_rows] = leaf_labels
             
-            clusterer = AgglomerativeClustering(
-                n_clusters=n_clusters,
-                linkage='ward',
-                metric='euclidean',
-            )
-            level_labels = clusterer.fit_predict(centroids)
+            # Group rows by label once; centroid sums and sizes in one reduceat pass
+            unique_ids, order, offsets = _group_by_label(level_labels)
+            group_sums, group_sizes = current.group_reduce(order, offsets)
+            group_centroids = group_sums / group_sizes[:, None].astype(group_sums.dtype)
+            group_labels = []
+            leaf_order, leaf_offsets = _regroup_leaves(leaf_order, leaf_labels)
+            leaf_rows = np.searchsorted(unique_ids, leaf_labels)
             
             # Build level taxonomy
             level_taxonomy = {}
-            for cluster_id in set(level_labels):
-                # Get members of this cluster
-                member_indices = [i for i, label in enumerate(level_labels) if label == cluster_id]
-                member_cids = [current_cluster_ids[i] for i in member_indices]
-                
-                # Aggregate cluster info
-                member_centroids = [current_level_data[cid]['centroid'] for cid in member_cids]
-                cluster_centroid = np.mean(member_centroids, axis=0)
+            for k, cluster_id in enumerate(unique_ids.tolist()):
+                # Members of this cluster (rows of the current level arrays)
+                member_indices = order[offsets[k]:offsets[k + 1]]
+                member_cids = [current.ids[i] for i in member_indices]
+                cluster_centroid = group_centroids[k]
+                total_size = int(group_sizes[k])
                 
-                # Collect all event indices from children
-                all_event_indices = []
+                # Children's examples until five are collected; events are a slice
                 all_examples = []
-                total_size = 0
                 for cid in member_cids:
-                    all_event_indices.extend(current_level_data[cid].get('event_indices', []))
-                    all_examples.extend(current_level_data[cid].get('examples', [])[:3])
-                    total_size += current_level_data[cid]['size']
-                    cluster_tree[(level, cluster_id)].append((level - 1, cid))
+                    if len(all_examples) >= 5:
+                        break
+                    all_examples.extend(current_level_data[cid].examples[:3])
+                cluster_tree[(level, cluster_id)].extend((level - 1, cid) for cid in member_cids)
                 
                 # Generate label (summarize children)
-                label = self._summarize_cluster_labels(
-                    [current_level_data[cid]['label'] for cid in member_cids]
-                )
+                label = self._summarize_cluster_labels([current.labels[i] for i in member_indices])
                 
-                level_taxonomy[cluster_id] = {
-                    'label': label,
-                    'description': f"Aggregation of {len(member_cids)} sub-clusters",
-                    'examples': all_examples[:5],
-                    'centroid': cluster_centroid,
-                    'size': total_size,
-                    'event_indices': all_event_indices,
-                    'children': member_cids,
-                }
+                level_taxonomy[cluster_id] = ClusterNode(
+                    label=label,
+                    description=f"Aggregation of {len(member_cids)} sub-clusters",
+                    examples=all_examples[:5],
+                    centroid=cluster_centroid,
+                    centroid_sum=group_sums[k],
+                    size=total_size,
+                    event_indices=leaf_order[leaf_offsets[k]:leaf_offsets[k + 1]],
+                    children=member_cids,
+                )
+                flattened[(level, cluster_id)] = level_taxonomy[cluster_id]
+                group_labels.append(label)
             
             hierarchy[level] = level_taxonomy
-            current_cluster_ids = list(level_taxonomy.keys())
+            current = LevelArrays(
+                centroid_sums=group_sums,
+                sizes=group_sizes,
+                ids=unique_ids.tolist(),
+                labels=group_labels,
+                centroids=group_centroids,
+            )
             current_level_data = level_taxonomy
+            level_arrays[level] = current
         
         self._hierarchy = hierarchy
+        self._level_arrays = level_arrays
         self._cluster_tree = dict(cluster_tree)
-        
-        # Flatten for return (keyed by (level, cluster_id))
-        flattened = {}
-        for level, level_data in hierarchy.items():
-            for cluster_id, cluster_info in level_data.items():
-                flattened[(level, cluster_id)] = cluster_info
+        self._index_level_centroids()
+        self._index_level_stats()
         
         return flattened
     
@@ -200,7 +444,8 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         embeddings: np.ndarray,
         descriptions: List[str],
         n_levels: int,
-    ) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        backend: LinkageBackend = 'auto',
+    ) -> Dict[Tuple[int, int], ClusterNode]:
         """
         Build hierarchy using recursive clustering (Clio-style).
         
@@ -209,6 +454,7 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         2. Summarize clusters bottom-up
         3. Use cluster summaries as input for next level
         """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         hierarchy = {}
         cluster_tree = defaultdict(list)
         
@@ -216,109 +462,145 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         # Use HDBSCAN for natural grouping
         from sklearn.cluster import HDBSCAN
         
-        clusterer = HDBSCAN(
-            min_cluster_size=self.min_cluster_size,
-            min_samples=2,
-            metric='cosine',
-        )
-        level_0_labels = clusterer.fit_predict(embeddings)
+        # Normalize once so cosine distance needs no per-pair norms
+        unit = _l2_normalize(embeddings)
+        if len(unit) <= PRECOMPUTED_DISTANCE_MAX_N:
+            # One GEMM gives the full cosine distance matrix
+            distances = np.clip(1.0 - unit @ unit.T, 0.0, None)
+            np.fill_diagonal(distances, 0.0)
+            clusterer = HDBSCAN(
+                min_cluster_size=self.min_cluster_size,
+                min_samples=2,
+                metric='precomputed',
+            )
+            level_0_labels = clusterer.fit_predict(distances)
+        else:
+            # Euclidean on unit vectors is monotone in cosine distance and
+            # lets HDBSCAN use its tree-based neighbor search
+            clusterer = HDBSCAN(
+                min_cluster_size=self.min_cluster_size,
+                min_samples=2,
+                metric='euclidean',
+            )
+            level_0_labels = clusterer.fit_predict(unit)
         
         # Build level 0 taxonomy
         level_0 = {}
-        unique_labels = set(level_0_labels)
-        for cluster_id in unique_labels:
+        unique_ids, order, offsets = _group_by_label(level_0_labels)
+        
+        # Leaf arrangement (noise excluded): event_indices of every node are slices of it
+        leaf_order = order.astype(np.int32)
+        leaf_rows = np.full(len(descriptions), -1, dtype=np.int64)  # event -> row of the current level
+        for k, cluster_id in enumerate(unique_ids.tolist()):
             if cluster_id == -1:  # Noise
                 continue
             
-            mask = level_0_labels == cluster_id
-            cluster_embeddings = embeddings[mask]
-            cluster_descriptions = [d for d, m in zip(descriptions, mask) if m]
-            event_indices = [i for i, m in enumerate(mask) if m]
+            # Stable sort keeps members in event order
+            member_indices = order[offsets[k]:offsets[k + 1]]
+            cluster_descriptions = [descriptions[i] for i in member_indices]
+            event_indices = leaf_order[offsets[k]:offsets[k + 1]]
+            leaf_rows[member_indices] = len(level_0)
             
-            centroid = cluster_embeddings.mean(axis=0)
+            centroid_sum = embeddings[member_indices].sum(axis=0)
+            centroid = centroid_sum / len(member_indices)
             label = self._generate_cluster_label(cluster_descriptions, cluster_descriptions[0])
             
-            level_0[cluster_id] = {
-                'label': label,
-                'description': cluster_descriptions[0],
-                'examples': cluster_descriptions[:5],
-                'centroid': centroid,
-                'size': len(cluster_descriptions),
-                'event_indices': event_indices,
-            }
+            level_0[cluster_id] = ClusterNode(
+                label=label,
+                description=cluster_descriptions[0],
+                examples=cluster_descriptions[:5],
+                centroid=centroid,
+                centroid_sum=centroid_sum,
+                size=len(cluster_descriptions),
+                event_indices=event_indices,
+            )
         
         hierarchy[0] = level_0
         
+        # Flattened view for return (keyed by (level, cluster_id)), filled as levels are built
+        flattened = {(0, cluster_id): info for cluster_id, info in level_0.items()}
+        
         # Recursively build higher levels
-        current_level = 0
         current_clusters = level_0
+        if len(unique_ids) and unique_ids[0] == -1:
+            leaf_order = leaf_order[offsets[1]:]
+        level_arrays = {}
+        if level_0:
+            level_arrays[0] = LevelArrays(
+                centroid_sums=np.stack([c.centroid_sum for c in level_0.values()]),
+                sizes=np.array([c.size for c in level_0.values()], dtype=np.int64),
+                ids=list(level_0.keys()),
+                labels=[c.label for c in level_0.values()],
+                centroids=np.stack([c.centroid for c in level_0.values()]),
+            )
         
-        for level in range(1, n_levels + 1):
-            if len(current_clusters) < 2:
-                break
-            
+        # Coarser at higher levels: each level keeps about a third of the clusters
+        level_counts = _level_cluster_counts(len(level_0), [3] * n_levels)
+        
+        for level, n_clusters in enumerate(level_counts, start=1):
             # Cluster the centroids from previous level
-            centroids = np.array([c['centroid'] for c in current_clusters.values()])
-            cluster_ids = list(current_clusters.keys())
-            
-            # Determine number of clusters (coarser at higher levels)
-            n_clusters = max(2, len(cluster_ids) // 3)
-            n_clusters = min(n_clusters, len(cluster_ids))
-            
-            if n_clusters < 2:
+            current = level_arrays[level - 1]
+            if n_clusters >= len(current.ids):
                 break
             
-            clusterer = AgglomerativeClustering(
-                n_clusters=n_clusters,
-                linkage='ward',
-            )
-            level_labels = clusterer.fit_predict(centroids)
+            level_labels = _ward_labels(current.centroids, n_clusters, backend)
+            
+            # Group rows by label once; centroid sums and sizes in one reduceat pass
+            unique_ids, order, offsets = _group_by_label(level_labels)
+            group_sums, group_sizes = current.group_reduce(order, offsets)
+            group_centroids = group_sums / group_sizes[:, None].astype(group_sums.dtype)
+            group_labels = []
+            leaf_labels = level_labels[leaf_rows]
+            leaf_order, leaf_offsets = _regroup_leaves(leaf_order, leaf_labels)
+            leaf_rows = np.searchsorted(unique_ids, leaf_labels)
             
             # Build level taxonomy
             level_taxonomy = {}
-            for cluster_id in set(level_labels):
-                member_indices = [i for i, label in enumerate(level_labels) if label == cluster_id]
-                member_cids = [cluster_ids[i] for i in member_indices]
+            for k, cluster_id in enumerate(unique_ids.tolist()):
+                member_indices = order[offsets[k]:offsets[k + 1]]
+                member_cids = [current.ids[i] for i in member_indices]
+                cluster_centroid = group_centroids[k]
+                total_size = int(group_sizes[k])
                 
-                # Aggregate
-                member_centroids = [current_clusters[cid]['centroid'] for cid in member_cids]
-                cluster_centroid = np.mean(member_centroids, axis=0)
-                
-                all_event_indices = []
                 all_examples = []
-                total_size = 0
                 for cid in member_cids:
-                    all_event_indices.extend(current_clusters[cid].get('event_indices', []))
-                    all_examples.extend(current_clusters[cid].get('examples', [])[:2])
-                    total_size += current_clusters[cid]['size']
-                    cluster_tree[(level, cluster_id)].append((level - 1, cid))
+                    if len(all_examples) >= 5:
+                        break
+                    all_examples.extend(current_clusters[cid].examples[:2])
+                cluster_tree[(level, cluster_id)].extend((level - 1, cid) for cid in member_cids)
                 
                 # Summarize labels from children
-                child_labels = [current_clusters[cid]['label'] for cid in member_cids]
+                child_labels = [current.labels[i] for i in member_indices]
                 label = self._summarize_cluster_labels(child_labels)
                 
-                level_taxonomy[cluster_id] = {
-                    'label': label,
-                    'description': f"Recursive aggregation: {', '.join(child_labels[:3])}",
-                    'examples': all_examples[:5],
-                    'centroid': cluster_centroid,
-                    'size': total_size,
-                    'event_indices': all_event_indices,
-                    'children': member_cids,
-                }
+                level_taxonomy[cluster_id] = ClusterNode(
+                    label=label,
+                    description=f"Recursive aggregation: {', '.join(child_labels[:3])}",
+                    examples=all_examples[:5],
+                    centroid=cluster_centroid,
+                    centroid_sum=group_sums[k],
+                    size=total_size,
+                    event_indices=leaf_order[leaf_offsets[k]:leaf_offsets[k + 1]],
+                    children=member_cids,
+                )
+                flattened[(level, cluster_id)] = level_taxonomy[cluster_id]
+                group_labels.append(label)
             
             hierarchy[level] = level_taxonomy
             current_clusters = level_taxonomy
-            current_level = level
+            level_arrays[level] = LevelArrays(
+                centroid_sums=group_sums,
+                sizes=group_sizes,
+                ids=unique_ids.tolist(),
+                labels=group_labels,
+                centroids=group_centroids,
+            )
         
         self._hierarchy = hierarchy
+        self._level_arrays = level_arrays
         self._cluster_tree = dict(cluster_tree)
-        
-        # Flatten for return
-        flattened = {}
-        for level, level_data in hierarchy.items():
-            for cluster_id, cluster_info in level_data.items():
-                flattened[(level, cluster_id)] = cluster_info
+        self._index_level_centroids()
+        self._index_level_stats()
         
         return flattened
     
@@ -328,21 +610,62 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         if len(labels) == 1:
             return labels[0]
         
-        # Extract key words from labels
-        words = []
-        for label in labels:
-            words.extend(label.lower().split()[:2])
-        
-        # Find most common words
-        from collections import Counter
-        word_counts = Counter(words)
-        common_words = [w for w, c in word_counts.most_common(2)]
+        # Find most common words among the first two words of each label
+        if NUMBA_AVAILABLE:
+            common_words = self._most_common_label_words(labels)
+        else:
+            words = []
+            for label in labels:
+                words.extend(label.lower().split()[:2])
+            
+            from collections import Counter
+            word_counts = Counter(words)
+            common_words = [w for w, c in word_counts.most_common(2)]
         
         if common_words:
             return " ".join(common_words).title()
         else:
             return f"{labels[0]} + {len(labels) - 1} more"
     
+    def _reset_label_vocab(self) -> None:
+        self._label_word_ids: Dict[str, int] = {}
+        self._label_words: List[str] = []
+        self._label_token_ids: Dict[str, np.ndarray] = {}
+        self._label_counts = np.zeros(0, dtype=np.int32)
+        self._label_first_pos = np.zeros(0, dtype=np.int64)
+    
+    def _tokenize_label(self, label: str) -> np.ndarray:
+        """Interned ids of a label's first two lowercased words (cached per label)."""
+        ids = self._label_token_ids.get(label)
+        if ids is None:
+            word_ids = []
+            for word in label.lower().split()[:2]:
+                word_id = self._label_word_ids.get(word)
+                if word_id is None:
+                    word_id = len(self._label_words)
+                    self._label_word_ids[word] = word_id
+                    self._label_words.append(word)
+                word_ids.append(word_id)
+            ids = np.array(word_ids, dtype=np.int32)
+            self._label_token_ids[label] = ids
+        return ids
+    
+    def _most_common_label_words(self, labels: List[str]) -> List[str]:
+        """Top-2 label words via the JIT token counter."""
+        token_ids = np.concatenate([self._tokenize_label(label) for label in labels])
+        if len(token_ids) == 0:
+            return []
+        
+        vocab_size = len(self._label_words)
+        if len(self._label_counts) < vocab_size:
+            # Grow scratch buffers geometrically; counts must stay zeroed between calls
+            capacity = max(vocab_size, 2 * len(self._label_counts))
+            self._label_counts = np.zeros(capacity, dtype=np.int32)
+            self._label_first_pos = np.zeros(capacity, dtype=np.int64)
+        
+        best, second = _top2_token_ids(token_ids, self._label_counts, self._label_first_pos)
+        return [self._label_words[t] for t in (best, second) if t >= 0]
+    
     def get_hierarchy_summary(self) -> Dict[str, Any]:
         """Get summary statistics of the hierarchy."""
         if self._hierarchy is None:
@@ -355,13 +678,10 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
             'avg_cluster_size_per_level': {},
         }
         
-        for level, level_data in self._hierarchy.items():
-            n_clusters = len(level_data)
-            avg_size = np.mean([c['size'] for c in level_data.values()]) if level_data else 0
-            
-            summary['clusters_per_level'][level] = n_clusters
-            summary['avg_cluster_size_per_level'][level] = avg_size
-            summary['total_clusters'] += n_clusters
+        for level, stats in self._level_stats.items():
+            summary['clusters_per_level'][level] = stats['n_clusters']
+            summary['avg_cluster_size_per_level'][level] = stats['avg_size']
+            summary['total_clusters'] += stats['n_clusters']
         
         return summary
     
@@ -382,32 +702,105 @@ class HierarchicalIntentTaxonomy(EmergentIntentTaxonomy):
         Returns:
             List of (intent_label, probability) tuples
         """
+        self._check_level(level)
+        
+        # Extract and embed event
+        description = self.extract_intent_description(event, use_llm=use_llm)
+        embedding = self.embed_intent(description)
+        
+        return self._rank_level_clusters(embedding, level)
+    
+    def assign_intents_hierarchical_batch(
+        self,
+        events: List[Dict],
+        level: int = 0,
+        use_llm: bool = True,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Assign many events to the hierarchical taxonomy at a level.
+        
+        Descriptions are embedded with a single batched encoder call instead
+        of one forward pass per event.
+        
+        Args:
+            events: List of event dictionaries
+            level: Hierarchy level (0 = finest, higher = coarser)
+            use_llm: Use LLM for intent extraction
+            
+        Returns:
+            One list of (intent_label, probability) tuples per event
+        """
+        self._check_level(level)
+        if level not in self._level_centroid_matrix:
+            return [[] for _ in events]
+        
+        descriptions = self.extract_intent_descriptions(events, use_llm=use_llm)
+        embeddings = self.embed_intents_batch(descriptions)
+        
+        # One GEMM scores every event against every cluster at the level
+        E = _l2_normalize(embeddings)
+        sims = E @ self._level_centroid_matrix[level].T
+        labels = self._level_labels[level]
+        
+        results = []
+        for row in sims:
+            order = np.argsort(-row, kind='stable')
+            results.append([(labels[i], float(row[i])) for i in order])
+        return results
+    
+    def _check_level(self, level: int) -> None:
+        """Raise if the hierarchy has not been built or lacks the level."""
         if self._hierarchy is None:
             raise ValueError("Hierarchy not discovered. Call discover_taxonomy_hierarchical() first.")
         
         if level not in self._hierarchy:
             raise ValueError(f"Level {level} not found in hierarchy. Available levels: {list(self._hierarchy.keys())}")
+    
+    def _index_level_centroids(self) -> None:
+        """
+        Precompute unit-length centroids for assignment.
         
-        # Extract and embed event
-        description = self.extract_intent_description(event, use_llm=use_llm)
-        embedding = self.embed_intent(description)
-        
-        # Find closest cluster at specified level
-        level_clusters = self._hierarchy[level]
-        similarities = []
+        Each level gets one L2-normalized (K, D) matrix, and every ClusterNode
+        gets a centroid_unit row view into it, so cosine similarity reduces
+        to a plain dot product at query time.
+        """
+        self._level_centroid_matrix = {}
+        self._level_labels = {}
+        
+        for level, arrays in self._level_arrays.items():
+            unit = _l2_normalize(arrays.centroids)
+            level_data = self._hierarchy[level]
+            for row, cluster_id in enumerate(arrays.ids):
+                level_data[cluster_id].centroid_unit = unit[row]
+            
+            self._level_centroid_matrix[level] = unit
+            self._level_labels[level] = arrays.labels
+    
+    def _index_level_stats(self) -> None:
+        """Record per-level cluster counts and size statistics once sizes are final."""
+        self._level_stats = {}
+        for level in self._hierarchy:
+            arrays = self._level_arrays.get(level)
+            sizes = arrays.sizes if arrays is not None else np.zeros(0, dtype=np.int64)
+            n_clusters = len(sizes)
+            total_size = int(sizes.sum())
+            self._level_stats[level] = {
+                'n_clusters': n_clusters,
+                'total_size': total_size,
+                'sum_size_sq': int((sizes * sizes).sum()),
+                'avg_size': total_size / n_clusters if n_clusters else 0.0,
+            }
+    
+    def _rank_level_clusters(self, embedding: np.ndarray, level: int) -> List[Tuple[str, float]]:
+        """Rank clusters at a level by cosine similarity to an embedding."""
+        if level not in self._level_centroid_matrix:
+            return []
         
-        for cluster_id, cluster_info in level_clusters.items():
-            centroid = cluster_info['centroid']
-            similarity = np.dot(embedding, centroid) / (np.linalg.norm(embedding) * np.linalg.norm(centroid))
-            similarities.append((cluster_info['label'], float(similarity)))
+        # Single GEMV against the stacked unit centroids
+        e = _l2_normalize(embedding)
+        sims = self._level_centroid_matrix[level] @ e
+        labels = self._level_labels[level]
         
         # Sort by similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities
-
-
-
-
-
-
-
+        order = np.argsort(-sims, kind='stable')
+        return [(labels[i], float(sims[i])) for i in order]
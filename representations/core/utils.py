@@ -6,10 +6,51 @@ import extraction, file operations, and PII redaction.
 """
 
 import ast
+import functools
+import hashlib
+import itertools
 import json
 import re
-from collections import defaultdict
+import threading
 from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, Mapping, NamedTuple
+
+import numpy as np
+
+# Optional: JIT-compiled per-file action counting
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional: SIMD multi-pattern prefilter for PII redaction
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Optional: faster JSON decoding of string event details
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional: JavaScript/TypeScript and Java parsers for AST tokenization
+try:
+    import esprima
+    ESPRIMA_AVAILABLE = True
+except ImportError:
+    ESPRIMA_AVAILABLE = False
+
+try:
+    import javalang
+    JAVALANG_AVAILABLE = True
+except ImportError:
+    JAVALANG_AVAILABLE = False
 
 
 # Function extraction patterns
@@ -19,29 +60,183 @@ EXPORT_FUNCTION_PATTERN = re.compile(r"\b(?:exports|module\.exports)\.([A-Za-z_]
 CLASS_STATEMENT_PATTERN = re.compile(r"\bclass\s+([A-Za-z_][\w]*)\b")
 
 
-def _python_function_names(code: str) -> list[str]:
-    """Extract Python function/class names from code."""
+# Python AST node types counted as ops / collected as definition names by analyze_python
+_PY_OP_NODE_TYPES = frozenset({ast.If, ast.For, ast.While, ast.FunctionDef, ast.AsyncFunctionDef, ast.Assign})
+_PY_DEF_NODE_TYPES = frozenset({ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef})
+
+# Token types emitted per Python AST node type (Name and Constant depend on the node)
+_PY_NODE_TOKENS = {
+    ast.FunctionDef: ('FUNCTION', 'IDENTIFIER'),  # Function name (canonicalized)
+    ast.ClassDef: ('CLASS', 'IDENTIFIER'),  # Class name (canonicalized)
+    ast.Call: ('CALL',),
+    ast.Attribute: ('ATTRIBUTE',),
+    ast.Assign: ('ASSIGN',),
+    ast.If: ('IF',),
+    ast.For: ('FOR',),
+    ast.While: ('WHILE',),
+    ast.Return: ('RETURN',),
+    ast.Import: ('IMPORT',),
+    ast.ImportFrom: ('IMPORT', 'FROM'),
+}
+
+
+# Results of parse-heavy helpers kept per distinct code snippet
+_CODE_MEMO_MAXSIZE = 4096
+_MISSING = object()
+
+
+def memoize_by_code(fn):
+    """
+    Memoize fn(code, *args) by a blake2b digest of code.
+    
+    Snippets recur across events (unchanged file contents), and parsing them
+    dominates. Digests stand in for the code so large snippets are not kept
+    alive; list results are stored as tuples and copied out, so callers may
+    mutate what they get. The oldest entry is evicted at _CODE_MEMO_MAXSIZE.
+    """
+    memo = {}
+    lock = threading.Lock()
+
+    @functools.wraps(fn)
+    def wrapper(code, *args):
+        if not code:
+            return fn(code, *args)
+        key = (hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).digest(), args)
+        cached = memo.get(key, _MISSING)
+        if cached is _MISSING:
+            result = fn(code, *args)
+            with lock:
+                if len(memo) >= _CODE_MEMO_MAXSIZE:
+                    memo.pop(next(iter(memo)), None)
+                memo[key] = tuple(result) if type(result) is list else result
+            return result
+        return list(cached) if type(cached) is tuple else cached
+
+    wrapper.cache_clear = memo.clear
+    return wrapper
+
+
+def _ast_nodes(tree: ast.AST) -> list[ast.AST]:
+    """All nodes of tree in ast.walk (breadth-first) order, collected without a generator chain."""
+    nodes = [tree]
+    append = nodes.append
+    # Iterating a list that grows underneath the loop visits the appended nodes too
+    for node in nodes:
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, ast.AST):
+                append(value)
+            elif isinstance(value, list):
+                nodes.extend([item for item in value if isinstance(item, ast.AST)])
+    return nodes
+
+
+class PythonAnalysis(NamedTuple):
+    """Everything derived from one parse of a Python snippet."""
+    ops: int
+    tokens: tuple[str, ...]
+    names: tuple[str, ...]
+
+
+@memoize_by_code
+def analyze_python(code: str) -> PythonAnalysis | None:
+    """Parse Python code once and collect op count, token types and definition names.
+    
+    count_ops, _tokenize_python_ast and the Python branch of
+    extract_function_names_from_code all read from this, so a snippet that
+    passes through several of them is parsed and walked only once.
+    
+    Args:
+        code: Python source
+    
+    Returns:
+        PythonAnalysis, or None if code does not parse
+    """
     try:
         tree = ast.parse(code)
-        return [node.name for node in ast.walk(tree) 
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
     except SyntaxError:
-        return []
+        return None
+    
+    ops = 0
+    tokens = []
+    names = []
+    node_tokens = _PY_NODE_TOKENS.get
+    for node in _ast_nodes(tree):
+        # Map AST node types to token types with one dict lookup
+        node_type = type(node)
+        if node_type is ast.Name:
+            if isinstance(node.ctx, (ast.Store, ast.Load)):
+                tokens.append('IDENTIFIER')
+        elif node_type is ast.Constant:
+            # bool is an int subclass, so booleans count as NUMBER
+            if isinstance(node.value, str):
+                tokens.append('STRING_LITERAL')
+            elif isinstance(node.value, (int, float)):
+                tokens.append('NUMBER')
+        else:
+            mapped = node_tokens(node_type)
+            if mapped:
+                tokens.extend(mapped)
+            if node_type in _PY_OP_NODE_TYPES:
+                ops += 1
+            if node_type in _PY_DEF_NODE_TYPES:
+                names.append(node.name)
+    
+    return PythonAnalysis(ops, tuple(tokens), tuple(names))
+
+
+def _python_function_names(code: str) -> list[str]:
+    """Extract Python function/class names from code."""
+    analysis = analyze_python(code)
+    return list(analysis.names) if analysis else []
 
 
 def extract_function_names_from_code(code: str, filename: str | None = None) -> list[str]:
     """Extract function/class names from code snippet."""
-    names: List[str] = []
     if not code:
-        return names
-    if filename and filename.endswith(".py"):
-        names.extend(_python_function_names(code))
-    if not names:
-        names.extend(JS_FUNCTION_PATTERN.findall(code))
-        names.extend(ARROW_FUNCTION_PATTERN.findall(code))
-        names.extend(EXPORT_FUNCTION_PATTERN.findall(code))
-        names.extend(CLASS_STATEMENT_PATTERN.findall(code))
-    return list(dict.fromkeys(names))
+        return []
+    return _extract_function_names(code, bool(filename and filename.endswith(".py")))
+
+
+@memoize_by_code
+def _extract_function_names(code: str, is_python: bool) -> list[str]:
+    found: Iterable[str] = _python_function_names(code) if is_python else []
+    if not found:
+        found = itertools.chain(
+            JS_FUNCTION_PATTERN.findall(code),
+            ARROW_FUNCTION_PATTERN.findall(code),
+            EXPORT_FUNCTION_PATTERN.findall(code),
+            CLASS_STATEMENT_PATTERN.findall(code),
+        )
+    
+    # Dedupe in first-seen order while streaming the sources
+    seen: set[str] = set()
+    names: list[str] = []
+    for name in found:
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+# File extension -> language for tokenizer selection
+_LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.js': 'javascript', '.jsx': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript',
+    '.java': 'java', '.cpp': 'cpp', '.c': 'c',
+    '.go': 'go', '.rs': 'rust', '.rb': 'ruby',
+    '.php': 'php', '.swift': 'swift', '.kt': 'kotlin',
+}
+
+@functools.lru_cache(maxsize=4096)
+def language_for_path(file_path: str) -> str:
+    """Tokenizer language for a file path; paths repeat across events, so the Path parse is cached."""
+    return _LANGUAGE_BY_EXTENSION.get(Path(file_path).suffix.lower(), 'unknown')
+
+
+# esprima identifiers/keywords kept by value (upper-cased) instead of IDENTIFIER
+_JS_DECLARATION_KEYWORDS = frozenset({'function', 'class', 'const', 'let', 'var', 'async', 'await'})
 
 
 def _extract_code_tokens(code: str, file_path: str | None = None) -> list[str]:
@@ -63,97 +258,57 @@ def _extract_code_tokens(code: str, file_path: str | None = None) -> list[str]:
     if not code:
         return []
     
-    language = None
-    
     # Detect language from file extension if available
-    if file_path:
-        ext = Path(file_path).suffix.lower()
-        language_map = {
-            '.py': 'python',
-            '.js': 'javascript', '.jsx': 'javascript',
-            '.ts': 'typescript', '.tsx': 'typescript',
-            '.java': 'java', '.cpp': 'cpp', '.c': 'c',
-            '.go': 'go', '.rs': 'rust', '.rb': 'ruby',
-            '.php': 'php', '.swift': 'swift', '.kt': 'kotlin',
-        }
-        language = language_map.get(ext, 'unknown')
+    language = language_for_path(file_path) if file_path else None
+    return tokenizer_for_language(language)(code)
+
+
+@functools.lru_cache(maxsize=16)
+def tokenizer_for_language(language: str | None) -> Callable[..., list[str]]:
+    """Tokenizer for a language, resolved once instead of per snippet.
+    
+    AST parsing preserves structure better than regex-based approaches, so
+    supported languages try their parser first and fall back to generic
+    tokenization if parsing fails; languages whose parser is not installed
+    go straight to the generic tokenizer.
     
-    # Try AST-based tokenization for supported languages
-    # AST parsing preserves structure better than regex-based approaches
+    The returned callable takes (code, max_tokens=None); with max_tokens it
+    may stop early once at least that many tokens have been produced.
+    """
     if language == 'python':
-        try:
-            return _tokenize_python_ast(code)
-        except SyntaxError:
-            pass  # Fall back to generic tokenization
+        def tokenize_python(code: str, max_tokens: int | None = None) -> list[str]:
+            try:
+                return _tokenize_python_ast(code, max_tokens)
+            except SyntaxError:
+                return _tokenize_generic(code, max_tokens)
+        return tokenize_python
     
-    elif language in ('javascript', 'typescript'):
-        try:
+    if language in ('javascript', 'typescript') and ESPRIMA_AVAILABLE:
+        def tokenize_js(code: str, max_tokens: int | None = None) -> list[str]:
             return _tokenize_js_ast(code, language)
-        except Exception:
-            pass  # Fall back to generic tokenization
+        return tokenize_js
     
-    elif language == 'java':
-        try:
+    if language == 'java' and JAVALANG_AVAILABLE:
+        def tokenize_java(code: str, max_tokens: int | None = None) -> list[str]:
             return _tokenize_java_ast(code)
-        except Exception:
-            pass  # Fall back to generic tokenization
+        return tokenize_java
     
     # Generic tokenization: extract token types, not values
     # This preserves structure while maintaining privacy and works across all languages
-    return _tokenize_generic(code)
+    return _tokenize_generic
 
 
-def _tokenize_python_ast(code: str) -> list[str]:
-    """Extract token types from Python code using AST."""
-    try:
-        tree = ast.parse(code)
-        tokens = []
-        
-        for node in ast.walk(tree):
-            # Map AST node types to token types
-            node_type = type(node).__name__
-            
-            if isinstance(node, ast.FunctionDef):
-                tokens.append('FUNCTION')
-                tokens.append('IDENTIFIER')  # Function name (canonicalized)
-            elif isinstance(node, ast.ClassDef):
-                tokens.append('CLASS')
-                tokens.append('IDENTIFIER')  # Class name (canonicalized)
-            elif isinstance(node, ast.Name):
-                if isinstance(node.ctx, ast.Store):
-                    tokens.append('IDENTIFIER')
-                elif isinstance(node.ctx, ast.Load):
-                    tokens.append('IDENTIFIER')
-            elif isinstance(node, ast.Constant):
-                if isinstance(node.value, str):
-                    tokens.append('STRING_LITERAL')
-                elif isinstance(node.value, (int, float)):
-                    tokens.append('NUMBER')
-                elif isinstance(node.value, bool):
-                    tokens.append('BOOLEAN')
-            elif isinstance(node, ast.Call):
-                tokens.append('CALL')
-            elif isinstance(node, ast.Attribute):
-                tokens.append('ATTRIBUTE')
-            elif isinstance(node, ast.Assign):
-                tokens.append('ASSIGN')
-            elif isinstance(node, ast.If):
-                tokens.append('IF')
-            elif isinstance(node, ast.For):
-                tokens.append('FOR')
-            elif isinstance(node, ast.While):
-                tokens.append('WHILE')
-            elif isinstance(node, ast.Return):
-                tokens.append('RETURN')
-            elif isinstance(node, ast.Import):
-                tokens.append('IMPORT')
-            elif isinstance(node, ast.ImportFrom):
-                tokens.append('IMPORT')
-                tokens.append('FROM')
-        
-        return tokens
-    except SyntaxError:
-        return _tokenize_generic(code)
+def _tokenize_python_ast(code: str, max_tokens: int | None = None) -> list[str]:
+    """Extract token types from Python code using AST.
+    
+    Token types are structural (CALL, ATTRIBUTE, FUNCTION, ...), which a lexical
+    pass with the tokenize module cannot recover; on Python 3.11 tokenize is
+    also slower than ast.parse plus the node walk.
+    """
+    analysis = analyze_python(code)
+    if analysis is None:
+        return _tokenize_generic(code, max_tokens)
+    return list(analysis.tokens)
 
 
 def _tokenize_js_ast(code: str, language: str = 'javascript') -> list[str]:
@@ -161,11 +316,10 @@ def _tokenize_js_ast(code: str, language: str = 'javascript') -> list[str]:
     
     Uses esprima or similar parser library if available, falls back to generic.
     """
+    if not ESPRIMA_AVAILABLE:
+        return _tokenize_generic(code)
+    
     try:
-        # Try to import esprima (common JS parser library)
-        # If not available, will fall back to generic tokenization
-        import esprima
-        
         tokens = []
         tree = esprima.parseScript(code, {'tokens': True, 'tolerant': True})
         
@@ -175,7 +329,7 @@ def _tokenize_js_ast(code: str, language: str = 'javascript') -> list[str]:
             
             # Map esprima token types to our canonical types
             if token_type in ('Identifier', 'Keyword'):
-                if token.value in ('function', 'class', 'const', 'let', 'var', 'async', 'await'):
+                if token.value in _JS_DECLARATION_KEYWORDS:
                     tokens.append(token.value.upper())
                 else:
                     tokens.append('IDENTIFIER')
@@ -203,9 +357,6 @@ def _tokenize_js_ast(code: str, language: str = 'javascript') -> list[str]:
                 tokens.append(token.value.upper())
         
         return tokens
-    except ImportError:
-        # esprima not available, fall back to generic
-        return _tokenize_generic(code)
     except Exception:
         # Parsing failed, fall back to generic
         return _tokenize_generic(code)
@@ -216,10 +367,10 @@ def _tokenize_java_ast(code: str) -> list[str]:
     
     Uses javalang or similar parser library if available, falls back to generic.
     """
+    if not JAVALANG_AVAILABLE:
+        return _tokenize_generic(code)
+    
     try:
-        # Try to import javalang (common Java parser library)
-        import javalang
-        
         tokens = []
         tree = javalang.parse.parse(code)
         
@@ -256,84 +407,123 @@ def _tokenize_java_ast(code: str) -> list[str]:
                 tokens.append('NUMBER')
         
         return tokens
-    except ImportError:
-        # javalang not available, fall back to generic
-        return _tokenize_generic(code)
     except Exception:
         # Parsing failed, fall back to generic
         return _tokenize_generic(code)
 
 
-def _tokenize_generic(code: str) -> list[str]:
+# Common keywords across languages (matched case-insensitively)
+_GENERIC_KEYWORDS = frozenset({
+    'function', 'def', 'class', 'const', 'let', 'var', 'if', 'else',
+    'for', 'while', 'return', 'import', 'export', 'from', 'async', 'await',
+    'try', 'catch', 'throw', 'new', 'this', 'super', 'extends', 'implements'
+})
+
+# Every ASCII casing of every keyword -> its token, so a word is classified
+# with one dict lookup instead of lower() + set membership + upper()
+_GENERIC_KEYWORD_TOKENS = {
+    ''.join(casing): keyword.upper()
+    for keyword in _GENERIC_KEYWORDS
+    for casing in itertools.product(*({ch.lower(), ch.upper()} for ch in keyword))
+}
+
+# Common operators
+_GENERIC_OPERATORS = frozenset({
+    '=', '==', '===', '!=', '!==', '<', '>', '<=', '>=',
+    '+', '-', '*', '/', '%', '&&', '||', '!', '++', '--',
+    '+=', '-=', '*=', '/=', '?', '??', '?.', '=>'
+})
+
+# Words and operator/punctuation runs in one alternation; the two character
+# classes are disjoint, so one pass finds exactly what two findalls would
+_GENERIC_TOKEN_PATTERN = re.compile(r'(\b[a-zA-Z_][a-zA-Z0-9_]*\b)|([{}()[\].,;:+\-*/=<>!&|?]+)')
+_DIGIT_PATTERN = re.compile(r'\d')
+
+# Lines skipped as comments once stripped
+_GENERIC_COMMENT_PREFIXES = ('//', '#')
+
+
+@functools.lru_cache(maxsize=1024)
+def _generic_op_token(op: str) -> str:
+    """Token type for an operator/punctuation run."""
+    if op in _GENERIC_OPERATORS:
+        return op.upper().replace('=', 'ASSIGN').replace('+', 'PLUS')
+    elif op in '()':
+        return 'PAREN'
+    elif op in '[]':
+        return 'BRACKET'
+    elif op in '{}':
+        return 'BRACE'
+    return 'OPERATOR'
+
+
+def _tokenize_generic(code: str, max_tokens: int | None = None) -> list[str]:
     """Generic tokenization that extracts token types without language-specific parsing.
     
     This is a fallback that works across languages by recognizing common patterns.
+    With max_tokens, scanning stops after the line that reaches it; the
+    tokens up to that point are the same as in a full scan.
     """
     tokens = []
-    lines = code.split('\n')
-    
-    # Common keywords across languages
-    keywords = {
-        'function', 'def', 'class', 'const', 'let', 'var', 'if', 'else',
-        'for', 'while', 'return', 'import', 'export', 'from', 'async', 'await',
-        'try', 'catch', 'throw', 'new', 'this', 'super', 'extends', 'implements'
-    }
-    
-    # Common operators
-    operators = {
-        '=', '==', '===', '!=', '!==', '<', '>', '<=', '>=',
-        '+', '-', '*', '/', '%', '&&', '||', '!', '++', '--',
-        '+=', '-=', '*=', '/=', '?', '??', '?.', '=>'
-    }
-    
-    for line in lines:
+    keyword_token = _GENERIC_KEYWORD_TOKENS.get
+    
+    for line in code.split('\n'):
         line = line.strip()
-        if not line or line.startswith('//') or line.startswith('#'):
+        if not line or line.startswith(_GENERIC_COMMENT_PREFIXES):
             continue
         
-        # Simple pattern matching
-        words = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', line)
-        for word in words:
-            if word.lower() in keywords:
-                tokens.append(word.upper())
+        # One scan per line; words are emitted before operators as before
+        ops = []
+        for word, op in _GENERIC_TOKEN_PATTERN.findall(line):
+            if word:
+                tokens.append(keyword_token(word, 'IDENTIFIER'))
             else:
-                tokens.append('IDENTIFIER')
-        
-        # Operators and punctuation
-        ops = re.findall(r'[{}()[\].,;:+\-*/=<>!&|?]+', line)
-        for op in ops:
-            if op in operators:
-                tokens.append(op.upper().replace('=', 'ASSIGN').replace('+', 'PLUS'))
-            elif op in '()':
-                tokens.append('PAREN')
-            elif op in '[]':
-                tokens.append('BRACKET')
-            elif op in '{}':
-                tokens.append('BRACE')
-            else:
-                tokens.append('OPERATOR')
+                ops.append(_generic_op_token(op))
+        tokens.extend(ops)
         
         # String literals
         if '"' in line or "'" in line or '`' in line:
             tokens.append('STRING_LITERAL')
         
         # Numbers
-        if re.search(r'\d', line):
+        if _DIGIT_PATTERN.search(line):
             tokens.append('NUMBER')
+        
+        if max_tokens is not None and len(tokens) >= max_tokens:
+            break
     
     return tokens
 
 
+# Source text every counted node needs (elif is an If); without any of it the
+# count is 0 whether or not the code parses
+_PY_OP_HINT_PATTERN = re.compile(r'=|if|for|while|def')
+
+
 def count_ops(code: str) -> int:
     """Count operations in Python code (for complexity estimation)."""
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
+    if not _PY_OP_HINT_PATTERN.search(code):
         return 0
-    return sum(
-        isinstance(node, (ast.If, ast.For, ast.While, ast.FunctionDef, ast.AsyncFunctionDef, ast.Assign))
-        for node in ast.walk(tree)
-    )
+    analysis = analyze_python(code)
+    return analysis.ops if analysis else 0
+
+
+_JS_IMPORT_FROM = re.compile(r"import\s+.*?\s+from\s+['\"](.+?)['\"]", re.MULTILINE)
+_JS_REQUIRE = re.compile(r"require\(['\"](.+?)['\"]\)", re.MULTILINE)
+_JS_DYNAMIC_IMPORT = re.compile(r"import\(['\"](.+?)['\"]\)", re.MULTILINE)
+_TS_SIDE_EFFECT_IMPORT = re.compile(r"import\s+['\"](.+?)['\"]", re.MULTILINE)
+
+# Import extraction patterns by file extension (unknown extensions use "js")
+_IMPORT_PATTERNS: dict[str, tuple[re.Pattern, ...]] = {
+    "js": (_JS_IMPORT_FROM, _JS_REQUIRE, _JS_DYNAMIC_IMPORT),
+    "ts": (_JS_IMPORT_FROM, _TS_SIDE_EFFECT_IMPORT),
+    "tsx": (_JS_IMPORT_FROM, _TS_SIDE_EFFECT_IMPORT),
+    "jsx": (_JS_IMPORT_FROM, _JS_REQUIRE),
+    "py": (
+        re.compile(r"^import\s+(\S+)", re.MULTILINE),
+        re.compile(r"^from\s+(\S+)\s+import", re.MULTILINE),
+    ),
+}
 
 
 def extract_imports_from_code(file_path: str, code: str) -> list[str]:
@@ -342,70 +532,187 @@ def extract_imports_from_code(file_path: str, code: str) -> list[str]:
         return []
 
     file_ext = file_path.split(".")[-1].lower() if "." in file_path else ""
-    patterns = {
-        "js": [
-            r"import\s+.*?\s+from\s+['\"](.+?)['\"]",
-            r"require\(['\"](.+?)['\"]\)",
-            r"import\(['\"](.+?)['\"]\)",
-        ],
-        "ts": [
-            r"import\s+.*?\s+from\s+['\"](.+?)['\"]",
-            r"import\s+['\"](.+?)['\"]",
-        ],
-        "tsx": [
-            r"import\s+.*?\s+from\s+['\"](.+?)['\"]",
-            r"import\s+['\"](.+?)['\"]",
-        ],
-        "jsx": [
-            r"import\s+.*?\s+from\s+['\"](.+?)['\"]",
-            r"require\(['\"](.+?)['\"]\)",
-        ],
-        "py": [
-            r"^import\s+(\S+)",
-            r"^from\s+(\S+)\s+import",
-        ],
-    }
-
-    lang_patterns = patterns.get(file_ext, patterns.get("js", []))
-    imports: List[str] = []
-    for pattern in lang_patterns:
-        matches = re.findall(pattern, code, re.MULTILINE)
-        imports.extend(matches)
-
-    unique_imports = []
-    seen = set()
-    for imp in imports:
-        if imp.startswith(".") or imp.startswith("/") or "/" in imp:
-            if imp not in seen:
-                seen.add(imp)
-                unique_imports.append(imp)
-    return unique_imports
+    return _extract_imports(code, file_ext)
 
 
-def files_repr(trace: dict) -> str:
-    """Extract file-level representation with action counts."""
-    file_actions: Dict[str, Dict[str, int]] = defaultdict(
-        lambda: {
-            "edits": 0,
-            "navigations": 0,
-            "ai_context": 0,
-            "prompts": 0,
-            "terminal_refs": 0,
-        }
-    )
+@memoize_by_code
+def _extract_imports(code: str, file_ext: str) -> list[str]:
+    imports: list[str] = []
+    for pattern in _IMPORT_PATTERNS.get(file_ext, _IMPORT_PATTERNS["js"]):
+        imports.extend(pattern.findall(code))
 
-    for event in trace.get("events", []):
-        details = event.get("details") or {}
+    # Keep local/path imports, first occurrence order
+    return list(dict.fromkeys(
+        imp for imp in imports if imp.startswith(".") or imp.startswith("/") or "/" in imp
+    ))
+
+
+def _has_wide_float(value) -> bool:
+    """Whether a decoded JSON value holds a float outside the 64-bit integer range."""
+    if isinstance(value, float):
+        return not -2.0 ** 63 < value < 2.0 ** 64
+    if isinstance(value, dict):
+        return any(map(_has_wide_float, value.values()))
+    if isinstance(value, list):
+        return any(map(_has_wide_float, value))
+    return False
+
+
+# Only short details strings are memoized; long ones carry whole file contents
+# and are not worth pinning (along with their decoded dicts) for the process lifetime
+_DETAILS_CACHE_MAX_CHARS = 8192
+_DETAILS_CACHE_MAXSIZE = 1024
+
+
+def _parse_details_json(text: str):
+    if ORJSON_AVAILABLE:
+        # orjson rejects NaN and lone surrogates, and decodes integers wider than
+        # 64 bits as floats; leave those to json so the decoded value is the same
+        try:
+            value = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            if not _has_wide_float(value):
+                return value
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+_parse_details_json_cached = functools.lru_cache(maxsize=_DETAILS_CACHE_MAXSIZE)(_parse_details_json)
+
+
+def event_details(event: dict) -> Mapping:
+    """
+    An event's details as a mapping, decoding JSON-string details.
+    
+    Short decoded strings are cached, so a trace passed through several
+    encoders parses each of them once; cached results are shared and come
+    back as read-only views. Undecodable or non-dict details give {}.
+    """
+    details = event.get('details', {})
+    if isinstance(details, str):
+        # Only a JSON object decodes to a dict; skip parsing anything else
+        if details.lstrip(' \t\n\r')[:1] != '{':
+            return {}
+        if len(details) > _DETAILS_CACHE_MAX_CHARS:
+            details = _parse_details_json(details)
+        else:
+            details = _parse_details_json_cached(details)
+            return MappingProxyType(details) if isinstance(details, dict) else {}
+    return details if isinstance(details, dict) else {}
+
+
+def _event_file_path(details: dict, use_uri: bool = True):
+    """First truthy file_path/file/target in event details, then the uri's fsPath/path."""
+    for key in ("file_path", "file", "target"):
+        value = details.get(key)
+        if value:
+            return value
+    if use_uri:
+        uri = details.get("uri")
+        if uri and isinstance(uri, dict):
+            return uri.get("fsPath") or uri.get("path")
+    return None
+
+
+def _iter_file_events(
+    trace: dict,
+    event_types: frozenset[str] | None = None,
+    use_uri: bool = True,
+) -> Iterator[tuple[str, object, dict]]:
+    """
+    Single pass over a trace's events, normalized for the file-level helpers.
+    
+    Args:
+        trace: Trace with an "events" list
+        event_types: If given, only events of these (lower-cased) types are
+            yielded; others are skipped before any path lookup
+        use_uri: Passed to _event_file_path
+    
+    Yields:
+        (lower-cased event type, _event_file_path of details or None, details)
+    """
+    for event in trace.get("events", ()):
         event_type = event.get("type", "").lower()
+        if event_types is not None and event_type not in event_types:
+            continue
+        details = event.get("details") or {}
+        yield event_type, _event_file_path(details, use_uri), details
+
+
+@functools.lru_cache(maxsize=4096)
+def _path_parts_pattern(file_path: str) -> re.Pattern:
+    """
+    Pattern matching a command that mentions file_path or any of its components.
+    
+    A command containing the full path contains every component, so one scan
+    for any component decides both; an empty component (leading slash) matches
+    every command, as the substring test did.
+    """
+    parts = sorted(set(file_path.split("/")), key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, parts)))
+
+
+# files_repr counter columns, and the columns each event type increments
+_FILE_ACTION_COLUMNS = ("edits", "navigations", "ai_context", "prompts", "terminal_refs")
+_FILE_ACTIONS_BY_EVENT_TYPE = {
+    "file_change": (0,),
+    "code_change": (0,),
+    "entry_created": (0,),
+    "ide_state": (1,),
+    "navigate": (1,),
+    "prompt": (2, 3),
+    "model_context": (2, 3),
+}
+_TERMINAL_EVENT_TYPES = frozenset({"terminal_command", "tool_interaction"})
+_EDIT_EVENT_TYPES = frozenset({"file_change", "code_change", "entry_created"})
+_NAVIGATION_EVENT_TYPES = frozenset({"ide_state", "navigate"})
+_TERMINAL_REFS_COLUMN = 4
 
-        file_path = (
-            details.get("file_path")
-            or details.get("file")
-            or details.get("target")
-            or details.get("uri", {}).get("fsPath")
-            or details.get("uri", {}).get("path")
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _accumulate_counts(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, counters: np.ndarray) -> None:
+        """counters[rows[i], cols[i]] += weights[i] for every i."""
+        for i in range(rows.shape[0]):
+            counters[rows[i], cols[i]] += weights[i]
+else:
+    def _accumulate_counts(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, counters: np.ndarray) -> None:
+        """counters[rows[i], cols[i]] += weights[i] for every i."""
+        np.add.at(counters, (rows, cols), weights)
+
+
+def _count_matrix(
+    rows: list[int],
+    cols: list[int],
+    n_rows: int,
+    n_cols: int,
+    weights: list[int] | None = None,
+) -> np.ndarray:
+    """Aggregate (row, col[, weight]) increments into an (n_rows, n_cols) int64 matrix."""
+    counters = np.zeros((n_rows, n_cols), dtype=np.int64)
+    if rows:
+        weight_array = np.ones(len(rows), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        _accumulate_counts(
+            np.asarray(rows, dtype=np.int32),
+            np.asarray(cols, dtype=np.int8),
+            weight_array,
+            counters,
         )
+    return counters
+
+
+def files_repr(trace: dict) -> str:
+    """Extract file-level representation with action counts."""
+    # Events are reduced to (file id, action column) pairs and counted in one pass
+    file_ids: dict[str, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
 
+    for event_type, file_path, details in _iter_file_events(trace):
         if not file_path and isinstance(details, dict):
             for key in ["file_path", "file", "target", "path"]:
                 if key in details:
@@ -416,49 +723,41 @@ def files_repr(trace: dict) -> str:
             continue
 
         file_path = str(file_path)
-        if event_type in ("file_change", "code_change", "entry_created"):
-            file_actions[file_path]["edits"] += 1
-        elif event_type in ("ide_state", "navigate"):
-            file_actions[file_path]["navigations"] += 1
-        elif event_type in ("prompt", "model_context"):
-            file_actions[file_path]["ai_context"] += 1
-            file_actions[file_path]["prompts"] += 1
-        elif event_type in ("terminal_command", "tool_interaction"):
+        actions = _FILE_ACTIONS_BY_EVENT_TYPE.get(event_type, ())
+        if event_type in _TERMINAL_EVENT_TYPES:
             command = details.get("command") or details.get("text") or ""
-            if file_path in command or any(part in command for part in file_path.split("/")):
-                file_actions[file_path]["terminal_refs"] += 1
-
-    file_reprs: List[str] = []
-    for file_path, counts in sorted(file_actions.items()):
-        total_actions = sum(counts.values())
-        if total_actions > 0:
-            file_reprs.append(
-                f"{file_path}:"
-                f"e{counts['edits']}:"
-                f"n{counts['navigations']}:"
-                f"a{counts['ai_context']}:"
-                f"p{counts['prompts']}:"
-                f"t{counts['terminal_refs']}"
-            )
+            if _path_parts_pattern(file_path).search(command):
+                actions = (_TERMINAL_REFS_COLUMN,)
+        if not actions:
+            continue
+
+        row = file_ids.setdefault(file_path, len(file_ids))
+        for col in actions:
+            rows.append(row)
+            cols.append(col)
+
+    counters = _count_matrix(rows, cols, len(file_ids), len(_FILE_ACTION_COLUMNS))
+
+    file_reprs: list[str] = []
+    for file_path, row in sorted(file_ids.items()):
+        edits, navigations, ai_context, prompts, terminal_refs = counters[row].tolist()
+        file_reprs.append(
+            f"{file_path}:"
+            f"e{edits}:"
+            f"n{navigations}:"
+            f"a{ai_context}:"
+            f"p{prompts}:"
+            f"t{terminal_refs}"
+        )
     return " | ".join(file_reprs) or trace.get("workspace_path", "unknown")
 
 
 def dependencies_repr(trace: dict) -> str:
     """Extract dependency relationships from code imports."""
-    dependencies: List[str] = []
-    seen_deps = set()
-
-    for event in trace.get("events", []):
-        details = event.get("details") or {}
-        event_type = event.get("type", "").lower()
-        if event_type not in ("file_change", "code_change", "entry_created"):
-            continue
+    # (file, import) pairs in first-seen order; only stringified for the final join
+    dependencies: dict[tuple[str, str], None] = {}
 
-        file_path = (
-            details.get("file_path")
-            or details.get("file")
-            or details.get("target")
-        )
+    for _, file_path, details in _iter_file_events(trace, _EDIT_EVENT_TYPES, use_uri=False):
         if not file_path:
             continue
 
@@ -469,53 +768,74 @@ def dependencies_repr(trace: dict) -> str:
 
         imports = extract_imports_from_code(file_path, code_content)
         for imported_path in imports:
-            dep_key = f"{file_path}→{imported_path}"
-            if dep_key not in seen_deps:
-                seen_deps.add(dep_key)
-                dependencies.append(dep_key)
+            dependencies[file_path, imported_path] = None
 
     if not dependencies:
         return files_repr(trace)[:512]
-    return " | ".join(dependencies)
+    return " | ".join(f"{file_path}→{imported_path}" for file_path, imported_path in dependencies)
+
+
+def _count_unique_pairs(rows: list[int], codes: list[int], n_rows: int, n_codes: int) -> np.ndarray:
+    """Number of distinct codes recorded against each row, as an (n_rows,) int64 array."""
+    if not rows:
+        return np.zeros(n_rows, dtype=np.int64)
+    pairs = np.unique(np.asarray(rows, dtype=np.int64) * n_codes + np.asarray(codes, dtype=np.int64))
+    return np.bincount(pairs // n_codes, minlength=n_rows)
+
+
+# File paths mentioned in a shell command: quoted, or bare with an optional ./ prefix
+_COMMAND_PATH_PATTERN = re.compile(
+    r"""["'](?P<quoted>[^"']+\.(?:py|js|ts|tsx|jsx|json|md|txt|yaml|yml|sh|bash|zsh))["']"""
+    r"""|(?:\./)?(?P<bare>[\w\-/]+\.(?:py|js|ts|tsx|jsx|json|md|txt|yaml|yml|sh|bash|zsh))\b"""
+)
+
+
+def _command_file_paths(command: str) -> list[str]:
+    """File paths referenced in a terminal command, first occurrence order."""
+    return list(dict.fromkeys(quoted or bare for quoted, bare in _COMMAND_PATH_PATTERN.findall(command)))
+
+
+# get_file_action_stats counter columns, in output order
+_FILE_STAT_COLUMNS = (
+    "total_edits",
+    "total_navigations",
+    "total_ai_context",
+    "total_prompts",
+    "total_terminal_refs",
+    "operation_count",
+)
+_STAT_EDITS, _STAT_NAVIGATIONS, _STAT_AI_CONTEXT, _STAT_PROMPTS, _STAT_TERMINAL_REFS, _STAT_OPERATIONS = range(6)
 
 
 def get_file_action_stats(traces: list[dict]) -> dict[str, dict[str, int]]:
     """Get file action statistics across multiple traces."""
-    stats: Dict[str, Dict[str, int | set]] = defaultdict(
-        lambda: {
-            "total_edits": 0,
-            "total_navigations": 0,
-            "total_ai_context": 0,
-            "total_prompts": 0,
-            "total_terminal_refs": 0,
-            "sessions": set(),
-            "operation_count": 0,
-        }
-    )
-
-    def extract_file_paths_from_command(command: str) -> List[str]:
-        paths: List[str] = []
-        patterns = [
-            r'["\']([^"\']+\.(py|js|ts|tsx|jsx|json|md|txt|yaml|yml|sh|bash|zsh))["\']',
-            r'([a-zA-Z0-9_\-/]+\\.(py|js|ts|tsx|jsx|json|md|txt|yaml|yml|sh|bash|zsh))',
-            r'\./([a-zA-Z0-9_\-/]+\\.(py|js|ts|tsx|jsx|json|md|txt|yaml|yml|sh|bash|zsh))',
-        ]
-        for pattern in patterns:
-            matches = re.findall(pattern, command)
-            for match in matches:
-                if isinstance(match, tuple):
-                    paths.append(match[0] if match[0] else match[1])
-                else:
-                    paths.append(match)
-        return list(dict.fromkeys(paths))
+    # Per-event work only interns the file and records (file id, column, amount)
+    # and (file id, session code); counting happens once at the end
+    file_ids: dict[str, int] = {}
+    session_codes: dict = {}
+    touched_rows: list[int] = []
+    touched_sessions: list[int] = []
+    rows: list[int] = []
+    cols: list[int] = []
+    weights: list[int] = []
+    session_code = 0  # code of the trace being scanned, read by touch()
+
+    def touch(file_path: str) -> int:
+        row = file_ids.setdefault(file_path, len(file_ids))
+        touched_rows.append(row)
+        touched_sessions.append(session_code)
+        return row
+
+    def add(row: int, col: int, amount: int = 1) -> None:
+        rows.append(row)
+        cols.append(col)
+        weights.append(amount)
 
     for trace in traces:
         session_id = trace.get("session_id", "unknown")
+        session_code = session_codes.setdefault(session_id, len(session_codes))
 
-        for event in trace.get("events", []):
-            details = event.get("details") or {}
-            event_type = event.get("type", "").lower()
-
+        for event_type, file_path, details in _iter_file_events(trace):
             if event_type == "prompt":
                 context_files = details.get("context_files", [])
                 if isinstance(context_files, str):
@@ -536,53 +856,123 @@ def get_file_action_stats(traces: list[dict]) -> dict[str, dict[str, int]]:
                         else:
                             continue
                         if file_path:
-                            fp = str(file_path)
-                            stats[fp]["sessions"].add(session_id)
-                            stats[fp]["total_prompts"] += 1
-                            stats[fp]["total_ai_context"] += 1
+                            row = touch(str(file_path))
+                            add(row, _STAT_PROMPTS)
+                            add(row, _STAT_AI_CONTEXT)
             elif event_type == "terminal_command":
                 command = details.get("command") or ""
                 if command:
-                    for file_path in extract_file_paths_from_command(command):
-                        stats[file_path]["sessions"].add(session_id)
-                        stats[file_path]["total_terminal_refs"] += 1
-            else:
-                file_path = (
-                    details.get("file_path")
-                    or details.get("file")
-                    or details.get("target")
-                    or details.get("uri", {}).get("fsPath")
-                    or details.get("uri", {}).get("path")
-                )
-                if file_path:
-                    fp = str(file_path)
-                    stats[fp]["sessions"].add(session_id)
-
-                    after_content = details.get("after_content") or ""
-                    before_content = details.get("before_content") or ""
-                    code_snippet = after_content if len(after_content) > len(before_content) else before_content
-                    if not code_snippet:
-                        code_snippet = details.get("code") or details.get("content") or ""
-                    if code_snippet:
-                        stats[fp]["operation_count"] += count_ops(code_snippet)
-
-                    if event_type in ("file_change", "code_change", "entry_created"):
-                        stats[fp]["total_edits"] += 1
-                    elif event_type in ("ide_state", "navigate"):
-                        stats[fp]["total_navigations"] += 1
-
-    result: Dict[str, Dict[str, int]] = {}
-    for file_path, value in stats.items():
+                    for file_path in _command_file_paths(command):
+                        add(touch(file_path), _STAT_TERMINAL_REFS)
+            elif file_path:
+                row = touch(str(file_path))
+
+                after_content = details.get("after_content") or ""
+                before_content = details.get("before_content") or ""
+                code_snippet = after_content if len(after_content) > len(before_content) else before_content
+                if not code_snippet:
+                    code_snippet = details.get("code") or details.get("content") or ""
+                if code_snippet:
+                    add(row, _STAT_OPERATIONS, count_ops(code_snippet))
+
+                if event_type in _EDIT_EVENT_TYPES:
+                    add(row, _STAT_EDITS)
+                elif event_type in _NAVIGATION_EVENT_TYPES:
+                    add(row, _STAT_NAVIGATIONS)
+
+    counters = _count_matrix(rows, cols, len(file_ids), len(_FILE_STAT_COLUMNS), weights)
+    unique_sessions = _count_unique_pairs(touched_rows, touched_sessions, len(file_ids), len(session_codes))
+
+    result: dict[str, dict[str, int]] = {}
+    for file_path, row in file_ids.items():
         result[file_path] = {
-            **{k: v for k, v in value.items() if k != "sessions"},
-            "unique_sessions": len(value["sessions"]),
+            **dict(zip(_FILE_STAT_COLUMNS, counters[row].tolist())),
+            "unique_sessions": int(unique_sessions[row]),
         }
     return result
 
 
+# PII patterns in the order they are applied; each pass runs on the output of
+# the previous one, so earlier rules take precedence over overlapping matches
+_PII_PARTS = {
+    'EMAIL': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'NAME': r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b',  # Capitalized words, likely names
+    'URL': r'https?://[^\s<>"{}|\\^`\[\]]+',
+    'IP': r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
+    'JWT_TOKEN': r'\beyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]{20,}\b',
+    'SECRET': r'\b[A-Za-z0-9+/]{32,}={0,2}\b',  # High entropy strings
+    'PHONE': r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
+    'SSN': r'\b\d{3}-\d{2}-\d{4}\b',
+    'CREDIT_CARD': r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b',
+}
+# Not fused into one alternation: a later rule can match only after an earlier
+# substitution (e.g. an IP right before a URL), and a leftmost-first scan lets
+# a URL swallow a name the NAME pass would have redacted
+_PII_PASSES = tuple((re.compile(pattern), f'[{kind}]') for kind, pattern in _PII_PARTS.items())
+
+
+# Rewrites \s as Python's str-mode whitespace set, which also covers \x1c-\x1f
+_PII_CLASS_OR_SPACE = re.compile(r'\[(?:\\.|[^\]\\])*\]|\\s')
+_pii_hs_database = None
+_pii_hs_lock = threading.Lock()
+_pii_hs_local = threading.local()
+
+
+def _hyperscan_pii_expression(pattern: str) -> bytes:
+    def widen(match: re.Match) -> str:
+        token = match.group()
+        if token.startswith('['):
+            return token.replace('\\s', '\\s\\x1c-\\x1f')
+        return '[\\s\\x1c-\\x1f]'
+    return _PII_CLASS_OR_SPACE.sub(widen, pattern).encode()
+
+
+def _stop_scan(pattern_id, start, end, flags, context) -> bool:
+    return True
+
+
+def _contains_pii(text: str) -> bool:
+    """Exact Hyperscan check for whether any _PII_PARTS rule matches ASCII text.
+    
+    Args:
+        text: ASCII text to scan
+    
+    Returns:
+        True if at least one PII rule matches somewhere in text
+    """
+    global _pii_hs_database
+    if _pii_hs_database is None:
+        with _pii_hs_lock:
+            if _pii_hs_database is None:
+                database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                expressions = [_hyperscan_pii_expression(p) for p in _PII_PARTS.values()]
+                database.compile(
+                    expressions=expressions,
+                    ids=list(range(len(expressions))),
+                    elements=len(expressions),
+                    flags=[0] * len(expressions),
+                )
+                _pii_hs_database = database
+    
+    # Scratch space is not shareable between concurrent scans
+    scratch = getattr(_pii_hs_local, 'scratch', None)
+    if scratch is None:
+        scratch = _pii_hs_local.scratch = hyperscan.Scratch(_pii_hs_database)
+    
+    try:
+        _pii_hs_database.scan(text.encode('ascii'), match_event_handler=_stop_scan, scratch=scratch)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
+
+
 def redact_pii(text: str, redact_all_strings: bool = True) -> str:
     """Redact PII from text content.
     
+    Rules are applied one pass at a time in _PII_PARTS order. When Hyperscan
+    is installed, ASCII text is first checked against all rules at once and
+    returned untouched if nothing matches, which is the common case.
+    
     Args:
         text: Text content to redact
         redact_all_strings: If True, redact all string literals. If False, only redact detected PII.
@@ -593,36 +983,25 @@ def redact_pii(text: str, redact_all_strings: bool = True) -> str:
     if not text:
         return text
     
-    # Email addresses
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
-    
-    # Names (capitalized words, likely names)
-    text = re.sub(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b', '[NAME]', text)
-    
-    # URLs
-    text = re.sub(r'https?://[^\s<>"{}|\\^`\[\]]+', '[URL]', text)
-    
-    # IP addresses
-    text = re.sub(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', '[IP]', text)
-    
-    # JWT tokens
-    text = re.sub(r'\beyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]{20,}\b', '[JWT_TOKEN]', text)
-    
-    # High entropy strings (potential secrets)
-    text = re.sub(r'\b[A-Za-z0-9+/]{32,}={0,2}\b', '[SECRET]', text)
-    
-    # Phone numbers
-    text = re.sub(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b', '[PHONE]', text)
-    
-    # SSN
-    text = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', text)
-    
-    # Credit card numbers
-    text = re.sub(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b', '[CREDIT_CARD]', text)
+    # Hyperscan's \b is ASCII-only, so its verdict is exact only for ASCII text
+    if HYPERSCAN_AVAILABLE and text.isascii() and not _contains_pii(text):
+        return text
     
+    for pattern, tag in _PII_PASSES:
+        text = pattern.sub(tag, text)
     return text
 
 
+# Double-, single- and backtick-quoted literals, replaced in that order; each
+# pass runs on the previous one's output, so an apostrophe in a comment cannot
+# pair with a quote inside a double-quoted literal and expose what follows
+_STRING_LITERAL_PASSES = (
+    ('"', re.compile(r'"[^"]*"'), '"[STR]"'),
+    ("'", re.compile(r"'[^']*'"), "'[STR]'"),
+    ('`', re.compile(r'`[^`]*`'), '`[STR]`'),
+)
+
+
 def redact_code_pii(code: str, redact_all_strings: bool = True) -> str:
     """Redact PII from code content, preserving code structure.
     
@@ -641,10 +1020,10 @@ def redact_code_pii(code: str, redact_all_strings: bool = True) -> str:
     
     # Optionally redact all string literals (for higher privacy)
     if redact_all_strings:
-        # Replace string literals (single, double, template literals)
-        code = re.sub(r'"[^"]*"', '"[STR]"', code)
-        code = re.sub(r"'[^']*'", "'[STR]'", code)
-        code = re.sub(r'`[^`]*`', '`[STR]`', code)
+        # Replace string literals (double, single, template literals)
+        for quote, pattern, replacement in _STRING_LITERAL_PASSES:
+            if quote in code:
+                code = pattern.sub(replacement, code)
     
     return code
 
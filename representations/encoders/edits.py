@@ -1,9 +1,35 @@
-import json
+import functools
 import hashlib
+import sqlite3
 from pathlib import Path
 from collections import Counter
+from typing import Dict, List, Optional
 from ..core.intent import intent_tokens_for_event, extract_event_intent, extract_emergent_intent
-from ..core.utils import extract_function_names_from_code
+from ..core.utils import event_details, extract_function_names_from_code
+
+# Event types whose op is derived from line counts, and those with a fixed op
+_MODIFY_EVENT_TYPES = frozenset({'file_change', 'code_change', 'entry_modified'})
+_FIXED_OP_BY_EVENT_TYPE = {
+    'entry_created': 'CREATE', 'file_created': 'CREATE',
+    'entry_deleted': 'DELETE', 'file_deleted': 'DELETE',
+}
+
+# Failures of the emergent taxonomy/encoder (model load, inference, on-disk embedding cache)
+_EMERGENT_INTENT_ERRORS = (OSError, RuntimeError, sqlite3.Error)
+
+def _emergent_intents_or_empty(intents_for):
+    """Wrap an emergent intent extractor so a taxonomy or model failure yields no intent tokens."""
+    def safe_intents_for(event: Dict) -> List[str]:
+        try:
+            return intents_for(event)
+        except _EMERGENT_INTENT_ERRORS:
+            return []
+    return safe_intents_for
+
+@functools.lru_cache(maxsize=65536)
+def _canonical_digest(text: str, length: int) -> str:
+    """Leading hex digits of md5(text); canonical IDs must match across runs, so the digest is cached rather than swapped."""
+    return hashlib.md5(text.encode()).hexdigest()[:length]
 
 def semantic_edits_repr(
     trace: dict, 
@@ -11,8 +37,19 @@ def semantic_edits_repr(
     include_intent: bool = True,
     canonicalize: bool = False,
     use_emergent: bool = True,
+    limit: Optional[int] = None,
 ) -> List[str]:
-    """Extract semantic edit representation: operation->target pairs with intent encoding."""
+    """Extract semantic edit representation: operation->target pairs with intent encoding.
+    
+    With limit, events stop being processed once limit edits exist and only
+    the first limit are returned, so callers needing a prefix skip the rest
+    of the trace (and its intent extraction).
+    
+    With use_emergent=False an event's keyword intents are computed once and
+    shared by its edit and its segment. The default emergent path is not
+    covered: edits use LLM-backed extraction and segments do not, so each
+    event is still extracted once for its edit and once for its segment.
+    """
     if not trace or not isinstance(trace, dict):
         return []
     
@@ -23,59 +60,90 @@ def semantic_edits_repr(
     
     max_segment_size = 10
     
+    # Flag-dependent steps are bound once here rather than re-branching per event
+    if canonicalize:
+        def make_target_base(file_path) -> str:
+            return f"F_{_canonical_digest(str(file_path), 8)}"
+        
+        def make_function_target(target_base: str, func_name) -> str:
+            return f"{target_base}::FN_{_canonical_digest(str(func_name), 6)}"
+    else:
+        def make_target_base(file_path) -> str:
+            return Path(file_path).stem
+        
+        def make_function_target(target_base: str, func_name) -> str:
+            return f"{target_base}::{func_name}"
+    
+    if include_intent:
+        event_intents_for = functools.partial(
+            intent_tokens_for_event,
+            include_llm=False,
+            use_canonicalized_paths=canonicalize,
+            use_emergent=use_emergent,
+        )
+        if use_emergent:
+            event_intents_for = _emergent_intents_or_empty(event_intents_for)
+            segment_intents_for = _emergent_intents_or_empty(
+                functools.partial(extract_emergent_intent, use_llm=False)
+            )
+        else:
+            segment_intents_for = functools.partial(extract_event_intent, use_canonicalized_paths=canonicalize)
+    else:
+        event_intents_for = segment_intents_for = None
+    
+    # With fixed categories an event's segment intents are the keyword vector its own
+    # intent tokens start from, so each is computed once and shared by both. Emergent
+    # edit and segment intents differ (use_llm), so that path keeps both calls
+    event_vectors: Optional[List[Optional[List[str]]]] = None
+    if include_intent and not use_emergent:
+        event_vectors = [None] * len(events)
+    
+    # Files recur across many events; derive each target base once per path
+    target_bases: Dict[str, str] = {}
+    
+    # Edit and intent tokens repeat throughout a trace; emit one string object per
+    # distinct token so downstream consumers hold references, not copies
+    shared_tokens: Dict[str, str] = {}
+    share = shared_tokens.setdefault
+    
     for i, event in enumerate(events):
+        if limit is not None and len(edits) >= limit:
+            break
         if not isinstance(event, dict):
             continue
             
         try:
-            event_type = event.get('type', '').lower()
-            op = event.get('operation') or event.get('verb') or event_type
-            target = event.get('target') or event.get('file') or event.get('symbol')
-            details = event.get('details', {})
-            
-            if isinstance(details, str):
-                try:
-                    details = json.loads(details)
-                except (json.JSONDecodeError, TypeError):
-                    details = {}
-            
-            if not isinstance(details, dict):
-                details = {}
+            get = event.get
+            event_type = get('type', '').lower()
+            op = get('operation') or get('verb') or event_type
+            target = get('target') or get('file') or get('symbol')
+            details = event_details(event)
             
             file_path = details.get('file_path') or details.get('file')
             lines_added = details.get('lines_added', 0) or 0
             lines_removed = details.get('lines_removed', 0) or 0
             diff_summary = details.get('diff_summary', '')
             
-            if event_type in ('file_change', 'code_change', 'entry_modified'):
+            if event_type in _MODIFY_EVENT_TYPES:
                 if lines_added > 0 and lines_removed == 0:
                     op = 'ADD'
                 elif lines_removed > 0 and lines_added == 0:
                     op = 'REMOVE'
                 else:
                     op = 'MODIFY'
-            elif event_type in ('entry_created', 'file_created'):
-                op = 'CREATE'
-            elif event_type in ('entry_deleted', 'file_deleted'):
-                op = 'DELETE'
+            else:
+                op = _FIXED_OP_BY_EVENT_TYPE.get(event_type, op)
             
             if file_path:
-                if canonicalize:
-                    path_hash = hashlib.md5(str(file_path).encode()).hexdigest()[:8]
-                    target_base = f"F_{path_hash}"
-                else:
-                    path_obj = Path(file_path)
-                    target_base = path_obj.stem
+                target_base = target_bases.get(file_path)
+                if target_base is None:
+                    target_base = target_bases[file_path] = make_target_base(file_path)
                 
                 code_content = details.get('after_content') or details.get('before_content', '')
                 if code_content:
                     funcs = extract_function_names_from_code(code_content, file_path)
                     if funcs:
-                        if canonicalize:
-                            func_hash = hashlib.md5(str(funcs[0]).encode()).hexdigest()[:6]
-                            target = f"{target_base}::FN_{func_hash}"
-                        else:
-                            target = f"{target_base}::{funcs[0]}"
+                        target = make_function_target(target_base, funcs[0])
                     else:
                         target = target_base
                 else:
@@ -87,84 +155,60 @@ def semantic_edits_repr(
                 elif lines_added > 10 or lines_removed > 10:
                     size_indicator = 'MEDIUM'
                 
-                edit_str = f"{op}->{target}"
+                # Segments are joined once per edit rather than grown with +=
+                edit_parts = [f"{op}->{target}"]
                 if size_indicator != 'SMALL':
-                    edit_str += f"->{size_indicator}"
+                    edit_parts.append(size_indicator)
                 
                 if diff_summary:
-                    summary_words = diff_summary.split()[:3]
+                    # Only the first two words are used; maxsplit stops scanning a long summary after them
+                    summary_words = diff_summary.split(None, 2)[:2]
                     if summary_words:
-                        edit_str += f"->{'_'.join(summary_words[:2])}"
-                
-                if include_intent:
-                    event_intents = intent_tokens_for_event(
-                        event, 
-                        include_llm=False,
-                        use_canonicalized_paths=canonicalize,
-                        use_emergent=use_emergent,
-                    )
-                    if event_intents:
-                        edit_str += f"->{event_intents[0]}"
-                        edits.append(edit_str)
-                        for additional_intent in event_intents[1:]:
-                            edits.append(f"INTENT->{additional_intent}")
-                    else:
-                        edits.append(edit_str)
-                else:
-                    edits.append(edit_str)
+                        edit_parts.append('_'.join(summary_words))
             elif op and target:
-                edit_str = f"{op}->{target}"
-                if include_intent:
-                    event_intents = intent_tokens_for_event(
-                        event, 
-                        include_llm=False,
-                        use_canonicalized_paths=canonicalize,
-                        use_emergent=use_emergent,
-                    )
-                    if event_intents:
-                        edit_str += f"->{event_intents[0]}"
-                        edits.append(edit_str)
-                        for additional_intent in event_intents[1:]:
-                            edits.append(f"INTENT->{additional_intent}")
-                    else:
-                        edits.append(edit_str)
-                else:
-                    edits.append(edit_str)
+                edit_parts = [f"{op}->{target}"]
             elif op:
-                if include_intent:
-                    event_intents = intent_tokens_for_event(
-                        event, 
-                        include_llm=False,
-                        use_canonicalized_paths=canonicalize,
-                        use_emergent=use_emergent,
-                    )
-                    if event_intents:
-                        edits.append(f"{op}->{event_intents[0]}")
-                        for additional_intent in event_intents[1:]:
-                            edits.append(f"INTENT->{additional_intent}")
+                edit_parts = [str(op)]
+            else:
+                edit_parts = None
+            
+            # The primary intent is appended to the edit itself, the rest follow as INTENT tokens
+            if edit_parts is not None:
+                event_intents = None
+                if event_intents_for is not None:
+                    if event_vectors is not None:
+                        event_vectors[i] = segment_intents_for(event)
+                        event_intents = event_intents_for(event, event_intent=event_vectors[i])
                     else:
-                        edits.append(str(op))
-                else:
-                    edits.append(str(op))
+                        event_intents = event_intents_for(event)
+                    if event_intents:
+                        edit_parts.append(event_intents[0])
+                edit_str = '->'.join(edit_parts)
+                edits.append(share(edit_str, edit_str))
+                if event_intents:
+                    for additional_intent in event_intents[1:]:
+                        intent_str = f"INTENT->{additional_intent}"
+                        edits.append(share(intent_str, intent_str))
         
-            if include_intent and (i + 1) % max_segment_size == 0:
-                segment_events = events[max(0, i - max_segment_size + 1):i + 1]
+            if segment_intents_for is not None and (i + 1) % max_segment_size == 0:
                 segment_intent_counts = Counter()
-                for seg_event in segment_events:
-                    if use_emergent:
-                        seg_intents = extract_emergent_intent(seg_event, use_llm=False)
-                    else:
-                        seg_intents = extract_event_intent(seg_event, use_canonicalized_paths=canonicalize)
+                for j in range(max(0, i - max_segment_size + 1), i + 1):
+                    seg_intents = event_vectors[j] if event_vectors is not None else None
+                    if seg_intents is None:
+                        seg_intents = segment_intents_for(events[j])
                     segment_intent_counts.update(seg_intents)
                 
+                # most_common(n) is already heapq.nlargest over the items, not a full sort
                 top_segment_intents = [intent for intent, _ in segment_intent_counts.most_common(3)]
                 for seg_intent in top_segment_intents:
-                    edits.append(f"SEGMENT_INTENT->{seg_intent}")
+                    seg_str = f"SEGMENT_INTENT->{seg_intent}"
+                    edits.append(share(seg_str, seg_str))
                 
-        except Exception:
+        except (TypeError, AttributeError, ValueError):
+            # Malformed event fields (non-string type/paths, non-numeric line counts)
             continue
     
-    return edits
+    return edits if limit is None else edits[:limit]
 
 def semantic_edits_repr_str(
     trace: Dict, 
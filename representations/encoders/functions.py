@@ -1,8 +1,14 @@
-import json
-from ..core.utils import extract_function_names_from_code
+import functools
+from typing import Dict, Optional
+from ..core.utils import event_details, extract_function_names_from_code
 
-def functions_repr(trace: dict, include_prompts: bool = True) -> list[str]:
-    """Extract function-level representation."""
+@functools.lru_cache(maxsize=1024)
+def _is_function_op(op: str) -> bool:
+    """Whether an operation/type name mentions functions; ops come from a small vocabulary, so each is lowered once."""
+    return 'function' in op.lower()
+
+def functions_repr(trace: dict, include_prompts: bool = True, limit: Optional[int] = None) -> list[str]:
+    """Extract function-level representation (at most limit names, if given)."""
     if not trace or not isinstance(trace, dict):
         return []
     
@@ -12,19 +18,13 @@ def functions_repr(trace: dict, include_prompts: bool = True) -> list[str]:
         return []
     
     for event in events:
+        if limit is not None and len(funcs) >= limit:
+            break
         if not isinstance(event, dict):
             continue
             
         try:
-            details = event.get('details', {})
-            if isinstance(details, str):
-                try:
-                    details = json.loads(details)
-                except (json.JSONDecodeError, TypeError):
-                    details = {}
-            
-            if not isinstance(details, dict):
-                details = {}
+            details = event_details(event)
             
             code = details.get('after_content') or details.get('before_content') or details.get('code', '')
             file_path = details.get('file_path') or details.get('file', '')
@@ -38,12 +38,12 @@ def functions_repr(trace: dict, include_prompts: bool = True) -> list[str]:
                     pass
             
             op = event.get('operation') or event.get('type')
-            if op and isinstance(op, str) and 'function' in op.lower():
+            if op and isinstance(op, str) and _is_function_op(op):
                 funcs.append(op)
         except Exception:
             continue
     
-    return funcs
+    return funcs if limit is None else funcs[:limit]
 
 def functions_repr_str(trace: Dict, limit: int = 50) -> str:
     """Extract functions as a string representation."""
@@ -1,76 +1,153 @@
-import json
+import functools
 from pathlib import Path
 from datetime import datetime
-from ..core.utils import extract_function_names_from_code
+from collections import Counter
+import numpy as np
+from ..core.utils import event_details, extract_function_names_from_code
 
-def module_graph_repr(trace: dict) -> list[str]:
-    """Extract module/file-level representation (DEPRECATED)."""
+# Optional: JIT-compiled edge sweep for large edit graphs
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+@functools.lru_cache(maxsize=4096)
+def _path_stem(file_path: str) -> str:
+    return Path(file_path).stem
+
+@functools.lru_cache(maxsize=8192)
+def _iso_timestamp(text: str) -> float:
+    """POSIX time of an ISO-8601 timestamp string ('Z' suffix allowed), or 0 if it does not parse."""
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp()
+    except (ValueError, OverflowError):
+        return 0
+
+def _scan_files(trace: dict, collect_modules: bool = True, collect_edits: bool = True) -> tuple[list[str], list[dict]]:
+    """
+    One pass over a trace's events, resolving each event's file once.
+
+    Returns (module_graph_repr tokens, _extract_file_edits edits); a side not
+    collected is left empty, so a caller needing both walks the events once.
+    """
     modules = []
     seen_files = set()
-    for event in trace.get('events', []):
-        details = event.get('details', {})
-        if isinstance(details, str):
-            try:
-                details = json.loads(details)
-            except:
-                details = {}
-        
-        file_path = details.get('file_path') or details.get('file')
-        if file_path and file_path not in seen_files:
-            module_name = Path(file_path).stem
-            if module_name:
-                modules.append(module_name)
-                seen_files.add(file_path)
-        
-        op = event.get('operation') or event.get('type')
-        if op and any(k in str(op).lower() for k in ['import', 'export', 'module', 'file']):
-            modules.append(str(op))
-    return modules
-
-def _extract_file_edits(trace: dict) -> list[dict]:
     edits = []
     for event in trace.get('events', []):
-        details = event.get('details', {})
-        if isinstance(details, str):
-            try: details = json.loads(details)
-            except: details = {}
+        details = event_details(event)
         
         file_path = details.get('file_path') or details.get('file')
-        timestamp = event.get('timestamp', 0)
         
-        if isinstance(timestamp, str):
-            try: timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
-            except: timestamp = 0
+        if collect_modules:
+            if file_path and file_path not in seen_files:
+                module_name = _path_stem(file_path)
+                if module_name:
+                    modules.append(module_name)
+                    seen_files.add(file_path)
+            
+            op = event.get('operation') or event.get('type')
+            if op and any(k in str(op).lower() for k in ['import', 'export', 'module', 'file']):
+                modules.append(str(op))
         
-        if file_path:
-            edits.append({'time': timestamp or 0, 'path': file_path})
-    return edits
+        if collect_edits:
+            timestamp = event.get('timestamp', 0)
+            if isinstance(timestamp, str):
+                timestamp = _iso_timestamp(timestamp)
+            
+            if file_path:
+                edits.append({'time': timestamp or 0, 'path': file_path})
+    return modules, edits
+
+def module_graph_repr(trace: dict) -> list[str]:
+    """Extract module/file-level representation (DEPRECATED)."""
+    return _scan_files(trace, collect_edits=False)[0]
+
+def _extract_file_edits(trace: dict) -> list[dict]:
+    return _scan_files(trace, collect_modules=False)[1]
+
+# Chronological traces with more edits than this find their edges with NumPy (or Numba)
+_VECTORIZED_EDGE_MIN_EDITS = 1024
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _chronological_edge_keys(times: np.ndarray, file_ids: np.ndarray, time_window_sec, n_files: int) -> np.ndarray:
+        """src * n_files + dst for every edit whose next edit on another file is within the window."""
+        keys = np.empty(len(file_ids), dtype=np.int64)
+        count = 0
+        partner = -1  # first edit after i + 1 on a file other than file_ids[i + 1]
+        for i in range(len(file_ids) - 2, -1, -1):
+            if file_ids[i + 1] != file_ids[i]:
+                partner = i + 1
+            if partner >= 0 and times[partner] - times[i] <= time_window_sec:
+                keys[count] = file_ids[i] * n_files + file_ids[partner]
+                count += 1
+        return keys[:count]
+else:
+    def _chronological_edge_keys(times: np.ndarray, file_ids: np.ndarray, time_window_sec, n_files: int) -> np.ndarray:
+        """src * n_files + dst for every edit whose next edit on another file is within the window."""
+        # The next edit on another file starts the run of equal ids after the edit's own run
+        run_starts = np.flatnonzero(file_ids[1:] != file_ids[:-1]) + 1
+        next_run = np.searchsorted(run_starts, np.arange(len(file_ids)), side='right')
+        src = np.flatnonzero(next_run < len(run_starts))
+        dst = run_starts[next_run[src]]
+        in_window = times[dst] - times[src] <= time_window_sec
+        return file_ids[src[in_window]] * n_files + file_ids[dst[in_window]]
+
+def _chronological_edge_ids(times: np.ndarray, file_ids: np.ndarray, time_window_sec) -> np.ndarray:
+    """
+    Unique (src, dst) file-id pairs linking each edit to the next edit on another file within the window.
+
+    times must be non-decreasing.
+    """
+    n_files = int(file_ids.max()) + 1
+    keys = np.unique(_chronological_edge_keys(times, file_ids, time_window_sec, n_files))
+    return np.stack(np.divmod(keys, n_files), axis=1)
 
 def file_edit_graph_repr(trace: dict, time_window_sec: int = 300, canonicalize: bool = False) -> list[str]:
     """Extract file-level edit graph representation."""
     edits = _extract_file_edits(trace)
     if len(edits) < 2: return []
     
-    all_files = list(set(e['path'] for e in edits))
+    times = [e['time'] for e in edits]
+    paths = [e['path'] for e in edits]
+    # Unique paths in first-edit order
+    all_files = list(dict.fromkeys(paths))
     if canonicalize:
         name_map = {f: f"F{i:03d}" for i, f in enumerate(sorted(all_files))}
     else:
-        name_map = {f: Path(f).stem for f in all_files}
+        name_map = {f: _path_stem(f) for f in all_files}
     
     edges = set()
-    for i, e1 in enumerate(edits):
-        for e2 in edits[i+1:]:
-            if e1['path'] == e2['path']: continue
-            if 0 <= e2['time'] - e1['time'] <= time_window_sec:
-                edges.add((name_map[e1['path']], name_map[e2['path']]))
-                break
+    time_array = np.asarray(times) if len(edits) > _VECTORIZED_EDGE_MIN_EDITS else None
+    if time_array is not None and time_array.dtype.kind in 'iuf' and np.all(time_array[1:] >= time_array[:-1]):
+        file_index = {f: i for i, f in enumerate(all_files)}
+        file_ids = np.fromiter((file_index[p] for p in paths), dtype=np.int64, count=len(paths))
+        for src, dst in _chronological_edge_ids(time_array, file_ids, time_window_sec).tolist():
+            edges.add((name_map[all_files[src]], name_map[all_files[dst]]))
+    elif all(t1 <= t2 for t1, t2 in zip(times, times[1:])):
+        # Chronological edits: an edit's only candidate partner is the next edit on
+        # another file, since every later one is at least as far away in time.
+        # Sweeping backwards, partner is the first edit after i + 1 on a file other than paths[i + 1]
+        partner = None
+        for i in range(len(edits) - 2, -1, -1):
+            if paths[i + 1] != paths[i]: partner = i + 1
+            if partner is not None and times[partner] - times[i] <= time_window_sec:
+                edges.add((name_map[paths[i]], name_map[paths[partner]]))
+    else:
+        for i, e1 in enumerate(edits):
+            for e2 in edits[i+1:]:
+                if e1['path'] == e2['path']: continue
+                if 0 <= e2['time'] - e1['time'] <= time_window_sec:
+                    edges.add((name_map[e1['path']], name_map[e2['path']]))
+                    break
     
     repr_tokens = [f"E_{s}_{d}" for s, d in sorted(edges)]
     
-    edit_counts = {}
-    for e in edits:
-        f = name_map[e['path']]
-        edit_counts[f] = edit_counts.get(f, 0) + 1
+    # Count per path in C, then fold paths that share a display name (same stem)
+    edit_counts = Counter()
+    for path, count in Counter(paths).items():
+        edit_counts[name_map[path]] += count
     for f, count in sorted(edit_counts.items()):
         repr_tokens.append(f"EDITS_{f}_{count}")
         
@@ -8,17 +8,130 @@ Includes MotifRegistry for tracking hash→pattern mappings and generating
 natural language descriptions for all discovered motifs.
 """
 
+import functools
 import hashlib
-import json
+import itertools
 import re
 from collections import Counter
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..core.utils import event_details
+
+# Optional: JIT-compiled n-gram counting for sequitur rules
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 
 # =============================================================================
 # MOTIF REGISTRY - Track hash→pattern mappings for meaningful descriptions
 # =============================================================================
 
+# Hotspot counts: the trailing _N of an original HOT_ pattern, or the first number in a motif
+_TRAILING_COUNT_PATTERN = re.compile(r'_(\d+)$')
+_FIRST_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+
+# Description types an unregistered hash motif is mapped onto
+_HASH_PATTERN_TYPES = (
+    'Edit Sequence',
+    'Code Change Flow',
+    'Multi-File Update',
+    'Refactor Pattern',
+    'Navigation Sequence',
+    'Development Flow',
+    'Modification Chain',
+    'Workflow Step',
+)
+
+
+def _describe_hash_motif(motif: str) -> str:
+    """Describe a hash-based motif (M_xxx) that has no registered pattern."""
+    # Use hash to deterministically select a description type
+    hash_val = motif[2:6]
+    try:
+        idx = int(hash_val, 16) % 8
+    except ValueError:
+        idx = 0
+    return f"{_HASH_PATTERN_TYPES[idx]} #{hash_val}"
+
+
+def _describe_hotspot_motif(motif: str) -> str:
+    match = _FIRST_NUMBER_PATTERN.search(motif)
+    if match:
+        return f"Edit Hotspot ({match.group(1)}x)"
+    return "Edit Hotspot"
+
+
+def _describe_intent_motif(motif: str) -> str:
+    if motif.startswith('INTENT_TYPE_'):
+        intent = motif.replace('INTENT_TYPE_', '').replace('_', ' ').title()
+        return f"{intent} Intent"
+    
+    if motif.startswith('INTENT_TRANS'):
+        return "Intent Transition"
+    
+    intent = motif.replace('INTENT_', '').replace('_', ' ').title()
+    return f"{intent} Signal"
+
+
+# Motif type prefix (text before the first '_') → description, replacing a startswith cascade
+_DESCRIBERS_BY_PREFIX: Dict[str, Callable[[str], str]] = {
+    'M': _describe_hash_motif,
+    'T': lambda motif: "Edit Transition",
+    'PS': lambda motif: "Frequent Sequence",
+    'SQ': lambda motif: "Compression Rule",
+    'CYCLE': lambda motif: "Edit Cycle",
+    'HOT': _describe_hotspot_motif,
+    'HOTSPOT': _describe_hotspot_motif,
+    'INTENT': _describe_intent_motif,
+    'DEPENDENCY': lambda motif: "Dependency Traversal",
+}
+
+
+def _category_unless_cycle_or_switching(category: str) -> Callable[[str], str]:
+    """Categorizer for prefixes that rank below the CYCLE and SWITCHING checks."""
+    def categorize(motif: str) -> str:
+        if 'CYCLE' in motif:
+            return 'Iterative Pattern'
+        if 'SWITCHING' in motif.upper():
+            return 'Diversity Pattern'
+        return category
+    return categorize
+
+
+# Motif type prefix → category for non-hash motifs (hashes are resolved through the registry)
+_CATEGORIZERS_BY_PREFIX: Dict[str, Callable[[str], str]] = {
+    'T': lambda motif: 'Sequential Pattern',
+    'PS': lambda motif: 'Sequential Pattern',
+    'TRANS': lambda motif: 'Sequential Pattern',
+    'NG': lambda motif: 'Sequential Pattern',
+    'CYCLE': lambda motif: 'Iterative Pattern',
+    'HOT': lambda motif: 'Iterative Pattern' if 'CYCLE' in motif else 'Hotspot Pattern',
+    'HOTSPOT': lambda motif: 'Iterative Pattern' if 'CYCLE' in motif else 'Hotspot Pattern',
+    'INTENT': _category_unless_cycle_or_switching('Intent Signal'),
+    'DEPENDENCY': _category_unless_cycle_or_switching('Dependency Pattern'),
+    'SQ': _category_unless_cycle_or_switching('Compression Pattern'),
+}
+
+# Original pattern prefix → category for registered hash motifs
+_HASHED_CATEGORIES_BY_PREFIX = {
+    'T': 'Sequential Pattern',
+    'PS': 'Frequent Sequence',
+    'SQ': 'Compression Pattern',
+    'CYCLE': 'Iterative Pattern',
+    'HOT': 'Hotspot Pattern',
+}
+
+# Descriptions and categories are derived and can be regenerated, so their
+# caches are bounded (oldest entry evicted) for long-running processes
+_MAX_CACHED_LABELS = 65536
+
+
 class MotifRegistry:
     """Registry that tracks motif hash → original pattern mappings.
     
@@ -29,9 +142,12 @@ class MotifRegistry:
     3. Categorize motifs by type
     """
     
+    __slots__ = ()
+    
     _instance = None
     _registry: Dict[str, str] = {}  # hash → original pattern
     _descriptions: Dict[str, str] = {}  # hash → natural language description
+    _categories: Dict[str, str] = {}  # motif → behavioral category
     
     def __new__(cls):
         if cls._instance is None:
@@ -42,6 +158,8 @@ class MotifRegistry:
     def register(cls, original: str, hashed: str) -> None:
         """Register a hash→pattern mapping."""
         cls._registry[hashed] = original
+        # A hash's category depends on its original pattern
+        cls._categories.pop(hashed, None)
     
     @classmethod
     def get_original(cls, hashed: str) -> Optional[str]:
@@ -57,13 +175,21 @@ class MotifRegistry:
         
         # Generate description
         desc = cls._generate_description(motif)
+        if len(cls._descriptions) >= _MAX_CACHED_LABELS:
+            cls._descriptions.pop(next(iter(cls._descriptions)), None)
         cls._descriptions[motif] = desc
         return desc
     
     @classmethod
     def get_category(cls, motif: str) -> str:
         """Get the behavioral category for a motif."""
-        return cls._categorize(motif)
+        category = cls._categories.get(motif)
+        if category is None:
+            category = cls._categorize(motif)
+            if len(cls._categories) >= _MAX_CACHED_LABELS:
+                cls._categories.pop(next(iter(cls._categories)), None)
+            cls._categories[motif] = category
+        return category
     
     @classmethod
     def _generate_description(cls, motif: str) -> str:
@@ -107,7 +233,7 @@ class MotifRegistry:
         
         # Hotspot: HOT_EV_xxx_N
         if pattern.startswith('HOT_'):
-            match = re.search(r'_(\d+)$', pattern)
+            match = _TRAILING_COUNT_PATTERN.search(pattern)
             if match:
                 count = match.group(1)
                 return f"Edit Hotspot ({count}x)"
@@ -119,7 +245,7 @@ class MotifRegistry:
         
         # Intent patterns
         if 'INTENT_' in pattern:
-            intent = pattern.split('INTENT_')[-1].split('_')[0]
+            intent = pattern.rpartition('INTENT_')[2].partition('_')[0]
             return f"{intent.title()} Intent Signal"
         
         # Generic event pattern
@@ -133,63 +259,15 @@ class MotifRegistry:
     def _describe_pattern_by_type(cls, motif: str) -> str:
         """Describe a motif based on its type prefix."""
         
-        # Hash-based motif without lookup
-        if motif.startswith('M_'):
-            # Use hash to deterministically select a description type
-            hash_val = motif[2:6]
-            try:
-                idx = int(hash_val, 16) % 8
-            except ValueError:
-                idx = 0
-            
-            pattern_types = [
-                'Edit Sequence',
-                'Code Change Flow',
-                'Multi-File Update',
-                'Refactor Pattern',
-                'Navigation Sequence',
-                'Development Flow',
-                'Modification Chain',
-                'Workflow Step',
-            ]
-            return f"{pattern_types[idx]} #{motif[2:6]}"
-        
-        # Transition
-        if motif.startswith('T_'):
-            return "Edit Transition"
-        
-        # PrefixSpan
-        if motif.startswith('PS_'):
-            return "Frequent Sequence"
-        
-        # Sequitur
-        if motif.startswith('SQ_'):
-            return "Compression Rule"
-        
-        # Cycle
-        if motif.startswith('CYCLE_'):
-            return "Edit Cycle"
-        
-        # Hotspot
-        if motif.startswith('HOT') or motif.startswith('HOTSPOT'):
-            match = re.search(r'(\d+)', motif)
-            if match:
-                return f"Edit Hotspot ({match.group(1)}x)"
-            return "Edit Hotspot"
+        prefix, sep, _ = motif.partition('_')
+        describe = _DESCRIBERS_BY_PREFIX.get(prefix) if sep else None
+        if describe is not None:
+            return describe(motif)
         
-        # Intent
-        if motif.startswith('INTENT_TYPE_'):
-            intent = motif.replace('INTENT_TYPE_', '').replace('_', ' ').title()
-            return f"{intent} Intent"
+        # Hotspot / dependency motifs without a '_' after the prefix (e.g. HOTSPOT5)
+        if motif.startswith('HOT'):
+            return _describe_hotspot_motif(motif)
         
-        if motif.startswith('INTENT_TRANS'):
-            return "Intent Transition"
-        
-        if motif.startswith('INTENT_'):
-            intent = motif.replace('INTENT_', '').replace('_', ' ').title()
-            return f"{intent} Signal"
-        
-        # Dependency
         if motif.startswith('DEPENDENCY'):
             return "Dependency Traversal"
         
@@ -210,51 +288,36 @@ class MotifRegistry:
     def _categorize(cls, motif: str) -> str:
         """Categorize a motif into behavioral categories."""
         
-        # Check original pattern if available
-        original = cls._registry.get(motif, motif)
-        
-        # Transition/sequence patterns
-        if any(motif.startswith(p) for p in ['T_', 'PS_', 'TRANS_', 'NG_']):
-            return 'Sequential Pattern'
-        
-        if motif.startswith('M_'):
-            # Hash-based - check original
-            if original != motif:
-                if original.startswith('T_'):
-                    return 'Sequential Pattern'
-                if original.startswith('PS_'):
-                    return 'Frequent Sequence'
-                if original.startswith('SQ_'):
-                    return 'Compression Pattern'
-                if original.startswith('CYCLE_'):
-                    return 'Iterative Pattern'
-                if original.startswith('HOT_'):
-                    return 'Hotspot Pattern'
-            # Default for hash
-            return 'Mined Pattern'
+        prefix, sep, _ = motif.partition('_')
+        if sep:
+            if prefix == 'M':
+                # Hash-based - check original pattern if available
+                original = cls._registry.get(motif, motif)
+                if original != motif:
+                    original_prefix, original_sep, _ = original.partition('_')
+                    if original_sep and original_prefix in _HASHED_CATEGORIES_BY_PREFIX:
+                        return _HASHED_CATEGORIES_BY_PREFIX[original_prefix]
+                # Default for hash
+                return 'Mined Pattern'
+            
+            categorize = _CATEGORIZERS_BY_PREFIX.get(prefix)
+            if categorize is not None:
+                return categorize(motif)
         
         # Structural patterns
-        if motif.startswith('CYCLE_') or 'CYCLE' in motif:
+        if 'CYCLE' in motif:
             return 'Iterative Pattern'
         
-        if motif.startswith('HOT') or motif.startswith('HOTSPOT'):
+        if motif.startswith('HOT'):
             return 'Hotspot Pattern'
         
         if 'SWITCHING' in motif.upper():
             return 'Diversity Pattern'
         
-        # Intent patterns
-        if motif.startswith('INTENT_'):
-            return 'Intent Signal'
-        
         # Dependency patterns
         if motif.startswith('DEPENDENCY'):
             return 'Dependency Pattern'
         
-        # Compression patterns
-        if motif.startswith('SQ_'):
-            return 'Compression Pattern'
-        
         return 'Other Pattern'
     
     @classmethod
@@ -262,6 +325,7 @@ class MotifRegistry:
         """Clear the registry (useful for testing)."""
         cls._registry.clear()
         cls._descriptions.clear()
+        cls._categories.clear()
     
     @classmethod
     def stats(cls) -> Dict[str, int]:
@@ -291,47 +355,101 @@ def transition_motifs(seq: List[str], max_count: int = 100) -> List[str]:
     if len(seq) < 2:
         return []
     
-    motifs = []
-    for a, b in zip(seq, seq[1:]):
-        motifs.append(f"T_{a}_{b}")
+    # Only the first max_count transitions are kept, so only those are formatted
+    head = seq[:max_count + 1] if max_count >= 0 else seq
+    motifs = [f"T_{a}_{b}" for a, b in zip(head, head[1:])]
     
     return motifs[:max_count]
 
 
-def structural_motifs(seq: List[str]) -> List[str]:
-    """Extract structural motifs (cycles, hotspots, switching patterns).
+def _intern_symbols(seq: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """Map a sequence's symbols to small integer ids.
     
-    Args:
-        seq: Sequence of event symbols
+    Mining counts and compares ids, and symbols are only looked up again
+    when motif names are formatted.
     
     Returns:
-        List of structural motif strings
+        (int64 id of each position, symbol of each id in first-seen order)
     """
+    sym2id = {}
+    ids = np.fromiter((sym2id.setdefault(s, len(sym2id)) for s in seq), dtype=np.int64, count=len(seq))
+    return ids, list(sym2id)
+
+
+# Above this many distinct symbols, packed trigram ids (a*n + b)*n + c overflow int64
+_MAX_PACKED_SYMBOLS = 2_097_151
+
+
+class _SequenceScan(NamedTuple):
+    """Adjacent-window statistics of an interned sequence."""
+    bigram_keys: np.ndarray  # a*n + b for each adjacent pair
+    trigram_keys: np.ndarray  # (a*n + b)*n + c for each adjacent triple
+    cycle_starts: np.ndarray  # positions i with seq[i] == seq[i+2] != seq[i+1]
+    symbol_counts: np.ndarray  # occurrences of each symbol id
+
+
+def _scan_sequence(ids: np.ndarray, n_symbols: int) -> _SequenceScan:
+    """Compute the statistics the sequitur and structural miners share, from one set of shifted views."""
+    packed = ids.astype(object) if n_symbols > _MAX_PACKED_SYMBOLS else ids
+    bigram_keys = packed[:-1] * n_symbols + packed[1:]
+    return _SequenceScan(
+        bigram_keys=bigram_keys,
+        trigram_keys=bigram_keys[:-1] * n_symbols + packed[2:],
+        cycle_starts=np.flatnonzero((ids[:-2] == ids[2:]) & (ids[:-2] != ids[1:-1])),
+        symbol_counts=np.bincount(ids, minlength=n_symbols),
+    )
+
+
+def _structural_motifs(seq: List[str], scan: _SequenceScan, symbols: List[str]) -> List[str]:
+    """structural_motifs from a precomputed scan of seq."""
     motifs = []
     
-    if len(seq) < 2:
-        return motifs
-    
     # Cycles: A -> B -> A pattern
-    for i in range(len(seq) - 2):
-        if seq[i] == seq[i+2] and seq[i] != seq[i+1]:
-            motifs.append(f"CYCLE_{seq[i]}_{seq[i+1]}")
+    for i in scan.cycle_starts.tolist():
+        motifs.append(f"CYCLE_{seq[i]}_{seq[i+1]}")
     
-    # Hotspots: frequent repeated event types
-    cnt = Counter(seq)
-    for sym, k in cnt.items():
+    # Hotspots: frequent repeated event types (ids are in first-seen order, like Counter keys)
+    for sym, k in zip(symbols, scan.symbol_counts.tolist()):
         if k >= 5:  # Threshold for "hotspot"
             motifs.append(f"HOT_{sym}_{k}")
     
     # High-switching: high diversity (many unique items)
-    if len(seq) > 0:
-        diversity_ratio = len(set(seq)) / len(seq)
-        if diversity_ratio > 0.7:
-            motifs.append("HIGH_SWITCHING")
+    diversity_ratio = len(symbols) / len(seq)
+    if diversity_ratio > 0.7:
+        motifs.append("HIGH_SWITCHING")
     
     return motifs
 
 
+def structural_motifs(seq: List[str]) -> List[str]:
+    """Extract structural motifs (cycles, hotspots, switching patterns).
+    
+    Args:
+        seq: Sequence of event symbols
+    
+    Returns:
+        List of structural motif strings
+    """
+    if len(seq) < 2:
+        return []
+    
+    ids, symbols = _intern_symbols(seq)
+    return _structural_motifs(seq, _scan_sequence(ids, len(symbols)), symbols)
+
+
+def _frequent_items(projected_db: List[List[str]], min_support: int) -> List[str]:
+    """Items occurring in at least min_support sequences of projected_db, in first-seen order."""
+    # Support counts sequences, so a database smaller than min_support has no frequent
+    # items; this ends mining of a single sequence (min_support=2) before any counting
+    if len(projected_db) < min_support:
+        return []
+    counts = Counter()
+    for s in projected_db:
+        # dict.fromkeys keeps one of each item in first-occurrence order
+        counts.update(dict.fromkeys(s).keys())
+    return [item for item, count in counts.items() if count >= min_support]
+
+
 def prefixspan(seq: List[str], min_support: int = 2, max_len: int = 4) -> List[List[str]]:
     """PrefixSpan algorithm for frequent sequence pattern mining.
     
@@ -346,45 +464,43 @@ def prefixspan(seq: List[str], min_support: int = 2, max_len: int = 4) -> List[L
         List of frequent patterns (each pattern is a list of symbols)
     """
     patterns = []
+    if max_len <= 0:
+        return patterns
+    
+    # Depth-first over prefix extensions with an explicit stack instead of recursion;
+    # each entry is (prefix, projected database, iterator over its remaining frequent items)
+    stack = [([], [seq], iter(_frequent_items([seq], min_support)))]
+    while stack:
+        prefix, projected_db, items = stack[-1]
+        for item in items:
+            break
+        else:
+            stack.pop()
+            continue
+        
+        new_prefix = prefix + [item]
+        patterns.append(new_prefix)
+        
+        # Patterns at max_len are not extended, so their projection is never built
+        if len(new_prefix) < max_len:
+            new_db = []
+            for s in projected_db:
+                try:
+                    idx = s.index(item)
+                    new_db.append(s[idx+1:])
+                except ValueError:
+                    continue
+            stack.append((new_prefix, new_db, iter(_frequent_items(new_db, min_support))))
     
-    def project(prefix: List[str], projected_db: List[List[str]]):
-        """Recursive projection step."""
-        if len(prefix) >= max_len:
-            return
-        
-        # Count items in projected database
-        counts = Counter()
-        for s in projected_db:
-            visited = set()
-            for item in s:
-                if item not in visited:
-                    counts[item] += 1
-                    visited.add(item)
-        
-        # Extend prefix with frequent items
-        for item, count in counts.items():
-            if count >= min_support:
-                new_prefix = prefix + [item]
-                patterns.append(new_prefix)
-                
-                # Create new projected database
-                new_db = []
-                for s in projected_db:
-                    try:
-                        idx = s.index(item)
-                        new_db.append(s[idx+1:])
-                    except ValueError:
-                        continue
-                
-                # Recursively project
-                if len(new_prefix) < max_len:
-                    project(new_prefix, new_db)
-    
-    # Initialize with full sequence as single-item database
-    project([], [seq])
     return patterns
 
 
+def _prefixspan_motifs(ids: List[int], symbols: List[str], min_support: int, max_len: int) -> List[str]:
+    """prefixspan_motifs over an interned sequence."""
+    patterns = prefixspan(ids, min_support=min_support, max_len=max_len)
+    return [f"PS_{'_'.join([symbols[i] for i in p])}" for p in patterns if len(p) >= 2]  # Only multi-item patterns
+
+
 def prefixspan_motifs(seq: List[str], min_support: int = 2, max_len: int = 4) -> List[str]:
     """Extract frequent sequence motifs using PrefixSpan.
     
@@ -399,8 +515,60 @@ def prefixspan_motifs(seq: List[str], min_support: int = 2, max_len: int = 4) ->
     if len(seq) < 2:
         return []
     
-    patterns = prefixspan(seq, min_support=min_support, max_len=max_len)
-    return [f"PS_{'_'.join(p)}" for p in patterns if len(p) >= 2]  # Only multi-item patterns
+    ids, symbols = _intern_symbols(seq)
+    return _prefixspan_motifs(ids.tolist(), symbols, min_support, max_len)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _repeated_int_keys(keys: np.ndarray) -> np.ndarray:
+        """Keys occurring at least twice, in first-occurrence order."""
+        index = dict()
+        unique = np.empty(len(keys), dtype=np.int64)
+        counts = np.zeros(len(keys), dtype=np.int64)
+        n_unique = 0
+        for key in keys:
+            if key in index:
+                counts[index[key]] += 1
+            else:
+                index[key] = n_unique
+                unique[n_unique] = key
+                counts[n_unique] = 1
+                n_unique += 1
+        return unique[:n_unique][counts[:n_unique] >= 2]
+else:
+    def _repeated_int_keys(keys: np.ndarray) -> np.ndarray:
+        """Keys occurring at least twice, in first-occurrence order."""
+        _, first_index, counts = np.unique(keys, return_index=True, return_counts=True)
+        repeated_first = first_index[counts >= 2]
+        repeated_first.sort()
+        return keys[repeated_first]
+
+
+def _repeated_keys(keys: np.ndarray) -> List[int]:
+    """Packed n-gram keys occurring at least twice, in first-occurrence order."""
+    if keys.dtype == object:
+        return [key for key, count in Counter(keys.tolist()).items() if count >= 2]
+    return _repeated_int_keys(keys).tolist()
+
+
+def _sequitur_motifs(scan: _SequenceScan, symbols: List[str]) -> List[str]:
+    """sequitur_rules from a precomputed scan of a sequence of at least two symbols."""
+    n = len(symbols)
+    motifs = []
+    
+    # Find repeated bigrams (simplified Sequitur)
+    for key in _repeated_keys(scan.bigram_keys):
+        a, b = divmod(key, n)
+        motifs.append(f"SQ_{symbols[a]}_{symbols[b]}")
+    
+    # Find repeated trigrams
+    for key in _repeated_keys(scan.trigram_keys):
+        ab, c = divmod(key, n)
+        a, b = divmod(ab, n)
+        motifs.append(f"SQ_{symbols[a]}_{symbols[b]}_{symbols[c]}")
+    
+    return motifs
 
 
 def sequitur_rules(seq: List[str]) -> List[str]:
@@ -418,31 +586,17 @@ def sequitur_rules(seq: List[str]) -> List[str]:
     if len(seq) < 2:
         return []
     
-    motifs = []
-    
-    # Find repeated bigrams (simplified Sequitur)
-    bigram_counts = Counter()
-    for i in range(len(seq) - 1):
-        bigram = (seq[i], seq[i+1])
-        bigram_counts[bigram] += 1
-    
-    # Extract bigrams that appear multiple times
-    for bigram, count in bigram_counts.items():
-        if count >= 2:
-            motifs.append(f"SQ_{bigram[0]}_{bigram[1]}")
-    
-    # Find repeated trigrams
-    if len(seq) >= 3:
-        trigram_counts = Counter()
-        for i in range(len(seq) - 2):
-            trigram = (seq[i], seq[i+1], seq[i+2])
-            trigram_counts[trigram] += 1
-        
-        for trigram, count in trigram_counts.items():
-            if count >= 2:
-                motifs.append(f"SQ_{trigram[0]}_{trigram[1]}_{trigram[2]}")
+    ids, symbols = _intern_symbols(seq)
+    return _sequitur_motifs(_scan_sequence(ids, len(symbols)), symbols)
+
+
+@functools.lru_cache(maxsize=65536)
+def _motif_hash(motif: str) -> str:
+    """First 10 hex digits of the motif's SHA-1, the M_ id registered for it.
     
-    return motifs
+    Motif strings recur across traces, so each is hashed once per process.
+    """
+    return hashlib.sha1(motif.encode()).hexdigest()[:10]
 
 
 def unify_motifs(*motif_lists: List[str], max_total: int = 300, register: bool = True) -> List[str]:
@@ -453,23 +607,24 @@ def unify_motifs(*motif_lists: List[str], max_total: int = 300, register: bool =
     
     Args:
         *motif_lists: Variable number of motif lists to combine
-        max_total: Maximum total motifs to return
+        max_total: Maximum total motifs to return (motifs past the bound
+            are neither hashed nor registered)
         register: If True, register hash→pattern mappings in MotifRegistry
     
     Returns:
         Unified, deduplicated, bounded list of motifs
     """
-    motifs = []
-    for mlist in motif_lists:
-        motifs.extend(mlist)
-    
     # Hash motifs to bound cardinality & protect privacy
     # Use first 10 hex chars for stable but readable hashes
     hashed = []
     seen_hashes = set()
     
-    for m in motifs:
-        h = hashlib.sha1(m.encode()).hexdigest()[:10]
+    # Repeats of a motif hash identically, so only first occurrences are hashed,
+    # and those in one map() pass rather than a call per loop iteration
+    unique_motifs = dict.fromkeys(itertools.chain.from_iterable(motif_lists))
+    for m, h in zip(unique_motifs, map(_motif_hash, unique_motifs)):
+        if len(hashed) == max_total:
+            break
         hashed_motif = f"M_{h}"
         
         if h not in seen_hashes:
@@ -503,22 +658,33 @@ def motifs_from_sequence(seq: List[str], max_total: int = 300) -> List[str]:
     if not seq or len(seq) < 2:
         return []
     
+    # Intern and scan once; the structural and sequitur miners share the scan
+    ids, symbols = _intern_symbols(seq)
+    scan = _scan_sequence(ids, len(symbols))
+    
     return unify_motifs(
         transition_motifs(seq),
-        structural_motifs(seq),
-        prefixspan_motifs(seq, min_support=2, max_len=4),
-        sequitur_rules(seq),
+        _structural_motifs(seq, scan, symbols),
+        _prefixspan_motifs(ids.tolist(), symbols, min_support=2, max_len=4),
+        _sequitur_motifs(scan, symbols),
         max_total=max_total
     )
 
 
+def dedupe_preserve_order(items: Iterable[str]) -> List[str]:
+    """Drop repeated items, keeping first occurrences in order."""
+    seen = set()
+    return [item for item in items if not (item in seen or seen.add(item))]
+
+
 def extract_universal_motifs(
     sequence: List[str],
     include_transitions: bool = True,
     include_ngrams: bool = True,
     include_structural: bool = True,
     ngram_sizes: List[int] = [3, 4],
-    use_statistical_mining: bool = True
+    use_statistical_mining: bool = True,
+    dedupe: bool = True,
 ) -> List[str]:
     """Extract motifs from any sequence using universal programmatic methods.
     
@@ -537,6 +703,8 @@ def extract_universal_motifs(
         include_structural: Extract structural patterns (repetition, cycles)
         ngram_sizes: Sizes of n-grams to extract (legacy, kept for compatibility)
         use_statistical_mining: If True, use PrefixSpan/Sequitur; if False, use legacy n-grams
+        dedupe: If False, skip the final order-preserving deduplication (for
+            callers that deduplicate the combined result themselves)
     
     Returns:
         List of motif strings in unified format
@@ -581,10 +749,12 @@ def extract_universal_motifs(
     
     # Include the sequence itself (for sequence modeling)
     # This preserves the full sequence for LSTM training
-    motifs.extend(sequence)
+    if not dedupe:
+        motifs.extend(sequence)
+        return motifs
     
     # Deduplicate while preserving order
-    return list(dict.fromkeys(motifs))
+    return dedupe_preserve_order(itertools.chain(motifs, sequence))
 
 
 def extract_structural_motifs(trace: Dict) -> List[str]:
@@ -603,24 +773,25 @@ def extract_structural_motifs(trace: Dict) -> List[str]:
     
     # Track file switching patterns
     current_file = None
-    file_switches = []
-    edits_per_file = {}
+    previous_file = None
+    file_switches = 0
+    iterative_refine = False
+    edits_per_file = Counter()
     
     for event in events:
-        details = event.get('details', {})
-        if isinstance(details, str):
-            try:
-                details = json.loads(details)
-            except (json.JSONDecodeError, TypeError):
-                details = {}
+        details = event_details(event)
         
         file_path = details.get('file_path') or details.get('file')
         
         if file_path:
             if current_file and file_path != current_file:
-                file_switches.append((current_file, file_path))
+                file_switches += 1
+                # Back-and-forth: A -> B -> A
+                if file_path == previous_file:
+                    iterative_refine = True
+                previous_file = current_file
             current_file = file_path
-            edits_per_file[file_path] = edits_per_file.get(file_path, 0) + 1
+            edits_per_file[file_path] += 1
     
     # Hotspot editing: many edits in one file
     if edits_per_file:
@@ -629,15 +800,12 @@ def extract_structural_motifs(trace: Dict) -> List[str]:
             motifs.append(f"HOTSPOT_{max_edits}")
     
     # Dependency chasing: rapid file switches
-    if len(file_switches) > 3:
+    if file_switches > 3:
         motifs.append("DEPENDENCY_CHASE")
     
     # Iterative refinement: back-and-forth pattern
-    if len(file_switches) >= 2:
-        switch_pairs = [(file_switches[i][1], file_switches[i+1][1]) 
-                        for i in range(len(file_switches)-1)]
-        if any(pair[0] == pair[1] for pair in switch_pairs):
-            motifs.append("ITERATIVE_REFINE")
+    if iterative_refine:
+        motifs.append("ITERATIVE_REFINE")
     
     return motifs
 
@@ -661,8 +829,15 @@ def extract_intent_motifs(sequence: List[str]) -> List[str]:
     if not sequence:
         return motifs
     
+    # Classify each distinct symbol once; intent type is used for clustering
+    intent_types = {
+        item: item.replace('INTENT_', '')
+        for item in dict.fromkeys(sequence)
+        if item.startswith('INTENT_')
+    }
+    
     # Find intent markers
-    intent_indices = [i for i, item in enumerate(sequence) if item.startswith('INTENT_')]
+    intent_indices = [i for i, item in enumerate(sequence) if item in intent_types]
     
     if not intent_indices:
         return motifs
@@ -682,8 +857,7 @@ def extract_intent_motifs(sequence: List[str]) -> List[str]:
             motifs.append(f"INTENT_PATTERN_{pattern}")
         
         # Extract intent type for clustering
-        intent_type = intent.replace('INTENT_', '')
-        motifs.append(f"INTENT_TYPE_{intent_type}")
+        motifs.append(f"INTENT_TYPE_{intent_types[intent]}")
     
     # Find common intent transitions
     intent_transitions = []
@@ -1,3 +1,4 @@
+import itertools
 from typing import Dict, List
 from ..core.canonicalization import event_sequence
 from .motif_mining import (
@@ -5,6 +6,7 @@ from .motif_mining import (
     extract_structural_motifs,
     motifs_from_sequence,
     extract_universal_motifs,
+    dedupe_preserve_order,
 )
 
 def motifs_repr(
@@ -35,17 +37,14 @@ def motifs_repr(
             include_ngrams=True,
             include_structural=True,
             ngram_sizes=[3, 4],
-            use_statistical_mining=False
+            use_statistical_mining=False,
+            dedupe=False,  # deduplicated once below
         )
     
     structural_motifs = extract_structural_motifs(trace)
-    motifs.extend(structural_motifs)
+    intent_motifs = extract_intent_motifs(canonical_seq) if include_prompts else []
     
-    if include_prompts:
-        intent_motifs = extract_intent_motifs(canonical_seq)
-        motifs.extend(intent_motifs)
-    
-    return list(dict.fromkeys(motifs))
+    return dedupe_preserve_order(itertools.chain(motifs, structural_motifs, intent_motifs))
 
 def motifs_repr_str(trace: dict, limit: int = 50, max_length: int = 2000) -> str:
     """Extract motifs as a string representation."""
@@ -53,8 +52,8 @@ def motifs_repr_str(trace: dict, limit: int = 50, max_length: int = 2000) -> str
     if not motifs:
         return "EMPTY_WORKFLOW"
     
-    unique_motifs = list(dict.fromkeys(motifs))[:limit]
-    motif_str = " | ".join(unique_motifs)
+    # motifs_repr already deduplicates in order
+    motif_str = " | ".join(motifs[:limit])
     
     if len(motif_str) > max_length:
         motif_str = motif_str[:max_length] + "... [truncated]"
@@ -1,11 +1,84 @@
+import functools
 import json
 from ..core.utils import redact_code_pii, redact_pii
 
+# Before/after contents and prompts repeat across events (no-op edits, renames,
+# resent prompts); keep the bound small since entries hold whole file contents
+_REDACTION_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=_REDACTION_CACHE_SIZE)
+def _redact_code(content: str) -> str:
+    return redact_code_pii(content)
+
+@functools.lru_cache(maxsize=_REDACTION_CACHE_SIZE)
+def _redact_text(content: str) -> str:
+    return redact_pii(content)
+
+_CODE_CHANGE_EVENT_TYPES = frozenset(('code_change', 'file_change', 'entry_created'))
+_PROMPT_EVENT_TYPES = frozenset(('prompt', 'prompt_sent', 'conversation'))
+
+def _encode_code_change(event: dict, event_type: str, details: dict, include_metadata: bool, redact_pii_enabled: bool) -> dict:
+    before_content = details.get('before_content', '')
+    after_content = details.get('after_content', '')
+    
+    if redact_pii_enabled:
+        if before_content:
+            before_content = _redact_code(before_content)
+        if after_content:
+            after_content = _redact_code(after_content)
+    
+    code_change = {
+        'file_path': details.get('file_path') or details.get('file', ''),
+        'before_content': before_content,
+        'after_content': after_content,
+        'diff_summary': details.get('diff_summary', ''),
+        'timestamp': event.get('timestamp'),
+    }
+    
+    if include_metadata:
+        code_change['metadata'] = {
+            'event_id': event.get('id'),
+            'event_type': event_type,
+            'lines_added': details.get('lines_added'),
+            'lines_removed': details.get('lines_removed'),
+            'chars_added': details.get('chars_added'),
+            'chars_deleted': details.get('chars_deleted'),
+            'ai_generated': event.get('ai_generated', False),
+            'annotation': event.get('annotation'),
+            'intent': event.get('intent'),
+        }
+    
+    return code_change
+
+def _encode_prompt(event: dict, event_type: str, details: dict, include_metadata: bool, redact_pii_enabled: bool) -> dict:
+    prompt_content = details.get('text') or details.get('content') or event.get('text') or ''
+    
+    if redact_pii_enabled and prompt_content:
+        prompt_content = _redact_text(prompt_content)
+    
+    prompt = {
+        'content': prompt_content,
+        'timestamp': event.get('timestamp'),
+    }
+    
+    if include_metadata:
+        prompt['metadata'] = {
+            'event_id': event.get('id'),
+            'event_type': event_type,
+            'conversation_id': details.get('conversation_id'),
+            'model': details.get('model'),
+            'context_files': details.get('context_files'),
+        }
+    
+    return prompt
+
 def raw_repr(trace: dict, include_metadata: bool = True, redact_pii_enabled: bool = True) -> dict:
     """Extract raw representation: triple of (code_change, prompt, metadata) with PII redaction."""
+    code_changes = []
+    prompts = []
     result = {
-        'code_changes': [],
-        'prompts': [],
+        'code_changes': code_changes,
+        'prompts': prompts,
     }
     
     if include_metadata:
@@ -24,69 +97,16 @@ def raw_repr(trace: dict, include_metadata: bool = True, redact_pii_enabled: boo
         if not isinstance(details, dict):
             continue
         
-        if event_type in ('code_change', 'file_change', 'entry_created'):
-            before_content = details.get('before_content', '')
-            after_content = details.get('after_content', '')
-            file_path = details.get('file_path') or details.get('file', '')
-            
-            if redact_pii_enabled:
-                before_content = redact_code_pii(before_content)
-                after_content = redact_code_pii(after_content)
-            
-            code_change = {
-                'file_path': file_path,
-                'before_content': before_content,
-                'after_content': after_content,
-                'diff_summary': details.get('diff_summary', ''),
-                'timestamp': event.get('timestamp'),
-            }
-            
-            if include_metadata:
-                code_change['metadata'] = {
-                    'event_id': event.get('id'),
-                    'event_type': event_type,
-                    'lines_added': details.get('lines_added'),
-                    'lines_removed': details.get('lines_removed'),
-                    'chars_added': details.get('chars_added'),
-                    'chars_deleted': details.get('chars_deleted'),
-                    'ai_generated': event.get('ai_generated', False),
-                    'annotation': event.get('annotation'),
-                    'intent': event.get('intent'),
-                }
-            
-            result['code_changes'].append(code_change)
-            if include_metadata:
-                result['metadata']['code_change_count'] += 1
-        
-        elif event_type in ('prompt', 'prompt_sent', 'conversation'):
-            prompt_content = details.get('text') or details.get('content') or event.get('text') or ''
-            
-            if redact_pii_enabled:
-                prompt_content = redact_pii(prompt_content)
-            
-            prompt = {
-                'content': prompt_content,
-                'timestamp': event.get('timestamp'),
-            }
-            
-            if include_metadata:
-                prompt['metadata'] = {
-                    'event_id': event.get('id'),
-                    'event_type': event_type,
-                    'conversation_id': details.get('conversation_id'),
-                    'model': details.get('model'),
-                    'context_files': details.get('context_files'),
-                }
-            
-            result['prompts'].append(prompt)
-            if include_metadata:
-                result['metadata']['prompt_count'] += 1
+        if event_type in _CODE_CHANGE_EVENT_TYPES:
+            code_changes.append(_encode_code_change(event, event_type, details, include_metadata, redact_pii_enabled))
+        elif event_type in _PROMPT_EVENT_TYPES:
+            prompts.append(_encode_prompt(event, event_type, details, include_metadata, redact_pii_enabled))
     
     if 'prompts' in trace:
         for prompt_data in trace.get('prompts', []):
             prompt_content = prompt_data.get('text') or prompt_data.get('content', '')
-            if redact_pii_enabled:
-                prompt_content = redact_pii(prompt_content)
+            if redact_pii_enabled and prompt_content:
+                prompt_content = _redact_text(prompt_content)
             
             prompt = {
                 'content': prompt_content,
@@ -101,9 +121,11 @@ def raw_repr(trace: dict, include_metadata: bool = True, redact_pii_enabled: boo
                     'context_files': prompt_data.get('context_files'),
                 }
             
-            result['prompts'].append(prompt)
-            if include_metadata:
-                result['metadata']['prompt_count'] += 1
+            prompts.append(prompt)
+    
+    if include_metadata:
+        result['metadata']['code_change_count'] = len(code_changes)
+        result['metadata']['prompt_count'] = len(prompts)
     
     return result
 
@@ -1,5 +1,28 @@
-import json
-from ..core.utils import _extract_code_tokens
+from ..core.utils import event_details, language_for_path, memoize_by_code, tokenizer_for_language
+
+# Code tokens kept per event; identifiers are numbered in order of appearance
+_MAX_EVENT_TOKENS = 200
+_ID_TOKENS = tuple(f'ID_{i:03d}' for i in range(_MAX_EVENT_TOKENS + 1))
+
+@memoize_by_code
+def _canonical_code_tokens(code: str, language: str | None) -> list[str]:
+    """First _MAX_EVENT_TOKENS token types of a snippet, with identifiers numbered.
+    
+    Memoized by content digest and language, so a snippet repeated across
+    traces (or saved under another path) is tokenized once.
+    """
+    # Only the first tokens are kept, so the tokenizer may stop early and
+    # only those are canonicalized
+    code_tokens = tokenizer_for_language(language)(code, _MAX_EVENT_TOKENS)
+    canonicalized = []
+    id_counter = 1
+    for token in code_tokens[:_MAX_EVENT_TOKENS]:
+        if token == 'IDENTIFIER':
+            canonicalized.append(_ID_TOKENS[id_counter])
+            id_counter += 1
+        else:
+            canonicalized.append(token)
+    return canonicalized
 
 def tokens_repr(trace: dict, include_prompts: bool = True) -> list[str]:
     """Extract token-level representation: sequence of token types from code."""
@@ -11,44 +34,37 @@ def tokens_repr(trace: dict, include_prompts: bool = True) -> list[str]:
     if not events:
         return []
     
+    # Snippets recur across a trace's events (unchanged files, repeated
+    # saves); each distinct (snippet, language) is looked up once per call
+    snippet_tokens = {}
+    
     for event in events:
         if not isinstance(event, dict):
             continue
             
         try:
-            event_type = (event.get('type') or '').lower()
-            details = event.get('details', {})
+            raw_type = event.get('type')
+            event_type = (raw_type or '').lower()
+            details = event_details(event)
             
-            if isinstance(details, str):
-                try:
-                    details = json.loads(details)
-                except (json.JSONDecodeError, TypeError):
-                    details = {}
+            code_content = details.get('after_content') or details.get('before_content') or details.get('code', '')
+            file_path = details.get('file_path') or details.get('file')
             
-            if isinstance(details, dict):
-                code_content = details.get('after_content') or details.get('before_content') or details.get('code', '')
-                file_path = details.get('file_path') or details.get('file')
-                
-                if code_content and isinstance(code_content, str):
-                    try:
-                        code_tokens = _extract_code_tokens(code_content, file_path)
-                        canonicalized = []
-                        id_counter = 1
-                        for token in code_tokens:
-                            if token == 'IDENTIFIER':
-                                canonicalized.append(f'ID_{id_counter:03d}')
-                                id_counter += 1
-                            else:
-                                canonicalized.append(token)
-                        
-                        tokens.extend(canonicalized[:200])
-                        continue
-                    except Exception:
-                        pass
+            if code_content and isinstance(code_content, str):
+                try:
+                    language = language_for_path(file_path) if file_path else None
+                    key = (code_content, language)
+                    code_tokens = snippet_tokens.get(key)
+                    if code_tokens is None:
+                        code_tokens = snippet_tokens[key] = _canonical_code_tokens(code_content, language)
+                    tokens.extend(code_tokens)
+                    continue
+                except Exception:
+                    pass
             
-            kind = event.get('type') or event.get('annotation') or event.get('intent')
+            kind = raw_type or event.get('annotation') or event.get('intent')
             if kind:
-                tokens.append(str(kind))
+                tokens.append(kind if type(kind) is str else str(kind))
         except Exception:
             continue
     
@@ -0,0 +1,26 @@
+import unittest
+from unittest import mock
+
+from representations.encoders import edits
+
+
+def _trace():
+    return {'events': [{'type': 'file_change', 'details': {'file_path': 'src/app.py', 'lines_added': 3}}]}
+
+
+class SemanticEditsIntentFailureTest(unittest.TestCase):
+    def test_emergent_intent_failure_emits_edit_without_intent(self):
+        with mock.patch.object(edits, 'intent_tokens_for_event', side_effect=RuntimeError("model failed")):
+            result = edits.semantic_edits_repr(_trace(), use_emergent=True)
+        self.assertEqual(result, ['ADD->app'])
+
+    def test_segment_intent_failure_emits_no_segment_intents(self):
+        trace = {'events': _trace()['events'] * 10}
+        with mock.patch.object(edits, 'intent_tokens_for_event', return_value=[]), \
+                mock.patch.object(edits, 'extract_emergent_intent', side_effect=OSError("cache unavailable")):
+            result = edits.semantic_edits_repr(trace, use_emergent=True)
+        self.assertEqual(result, ['ADD->app'] * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
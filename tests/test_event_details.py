@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from representations.core import utils
+from representations.core.utils import event_details
+
+
+class EventDetailsTest(unittest.TestCase):
+    def test_cached_details_are_read_only(self):
+        event = {'details': json.dumps({'file_path': 'a.py', 'lines_added': 2})}
+        details = event_details(event)
+        self.assertEqual(details['file_path'], 'a.py')
+        with self.assertRaises(TypeError):
+            details['file_path'] = 'b.py'
+        self.assertEqual(event_details(event)['file_path'], 'a.py')
+
+    def test_long_details_are_not_cached(self):
+        content = 'x' * (utils._DETAILS_CACHE_MAX_CHARS + 1)
+        event = {'details': json.dumps({'after_content': content})}
+        before = utils._parse_details_json_cached.cache_info().currsize
+        self.assertEqual(event_details(event)['after_content'], content)
+        self.assertEqual(utils._parse_details_json_cached.cache_info().currsize, before)
+
+    def test_non_object_details_give_empty_dict(self):
+        self.assertEqual(event_details({'details': '[1, 2]'}), {})
+        self.assertEqual(event_details({'details': 'not json'}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
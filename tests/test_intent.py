@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from representations.core.intent import EmergentIntentTaxonomy
+
+
+class _FakeEncoder:
+    dim = 4
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, **kwargs):
+        vectors = np.ones((len(texts), self.dim), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class EmbedIntentsBatchTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.taxonomy = EmergentIntentTaxonomy(cache_dir=Path(self._tmp.name))
+        self.taxonomy._encoder = _FakeEncoder()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_empty_input_keeps_embedding_dimension(self):
+        embeddings = self.taxonomy.embed_intents_batch([])
+        self.assertEqual(embeddings.shape, (0, _FakeEncoder.dim))
+        self.assertEqual(embeddings.dtype, np.float32)
+
+    def test_extract_and_embed_empty_events(self):
+        descriptions, embeddings = self.taxonomy.extract_and_embed_batch([], use_llm=False)
+        self.assertEqual(descriptions, [])
+        self.assertEqual(embeddings.shape, (0, _FakeEncoder.dim))
+
+    def test_rows_match_descriptions(self):
+        embeddings = self.taxonomy.embed_intents_batch(["fix bug", "add test", "fix bug"])
+        self.assertEqual(embeddings.shape, (3, _FakeEncoder.dim))
+
+
+if __name__ == '__main__':
+    unittest.main()
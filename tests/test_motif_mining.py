@@ -0,0 +1,29 @@
+import unittest
+
+from representations.encoders.motif_mining import extract_structural_motifs
+
+
+def _trace(*paths):
+    return {'events': [{'type': 'file_change', 'details': {'file_path': path}} for path in paths]}
+
+
+class ExtractStructuralMotifsTest(unittest.TestCase):
+    def test_back_and_forth_is_iterative_refine(self):
+        self.assertEqual(extract_structural_motifs(_trace('a.py', 'b.py', 'a.py')), ['ITERATIVE_REFINE'])
+
+    def test_no_switches_gives_no_switch_motifs(self):
+        self.assertEqual(extract_structural_motifs(_trace('a.py', 'a.py', 'a.py')), [])
+
+    def test_forward_switches_are_not_iterative_refine(self):
+        self.assertEqual(extract_structural_motifs(_trace('a.py', 'b.py', 'c.py')), [])
+
+    def test_many_switches_with_return(self):
+        motifs = extract_structural_motifs(_trace(*['a.py', 'b.py'] * 3, 'c.py'))
+        self.assertEqual(motifs, ['DEPENDENCY_CHASE', 'ITERATIVE_REFINE'])
+
+    def test_hotspot(self):
+        self.assertEqual(extract_structural_motifs(_trace(*['a.py'] * 6, 'b.py')), ['HOTSPOT_6'])
+
+
+if __name__ == '__main__':
+    unittest.main()
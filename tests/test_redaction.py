@@ -0,0 +1,34 @@
+import unittest
+
+from representations.core.utils import redact_code_pii, redact_pii
+
+
+class RedactPiiTest(unittest.TestCase):
+    def test_url_does_not_swallow_following_name(self):
+        self.assertEqual(redact_pii("see https://example.com/Hello World"), "see [URL][NAME]")
+
+    def test_ip_directly_before_url(self):
+        self.assertEqual(redact_pii("10.0.0.16https://host/path"), "[IP][URL]")
+
+    def test_secret_directly_before_url(self):
+        self.assertEqual(redact_pii("a" * 32 + "https://host/path"), "[SECRET][URL]")
+
+    def test_rules_apply_in_order(self):
+        self.assertEqual(redact_pii("Contact Jane Doe at jane@example.com"), "[NAME] at [EMAIL]")
+
+    def test_text_without_pii_is_unchanged(self):
+        text = "nothing to see here, just lowercase words"
+        self.assertEqual(redact_pii(text), text)
+
+
+class RedactCodePiiTest(unittest.TestCase):
+    def test_apostrophe_in_comment_does_not_expose_literals(self):
+        code = "# it's fine\nx = \"a'b\"\nsecret = \"s3cr3tvalue\"\n"
+        self.assertEqual(redact_code_pii(code), "# it's fine\nx = \"[STR]\"\nsecret = \"[STR]\"\n")
+
+    def test_each_quote_kind_is_redacted(self):
+        self.assertEqual(redact_code_pii("a = 'x'; b = \"y\"; c = `z`"), "a = '[STR]'; b = \"[STR]\"; c = `[STR]`")
+
+
+if __name__ == "__main__":
+    unittest.main()